@@ -10,9 +10,12 @@ import requests
 import asyncio
 import aiohttp
 from datetime import datetime
-import json
 
-app = FastAPI(title="NocoDB Agent Gateway", version="1.0.0")
+from nocodb_compression import CompressionMiddleware
+from nocodb_json import FastJSONResponse, dumpb, dumps, loads
+
+app = FastAPI(title="NocoDB Agent Gateway", version="1.0.0", default_response_class=FastJSONResponse)
+app.add_middleware(CompressionMiddleware)
 
 # Configurações
 NOCODB_API = "https://nocodbclaudecode-production.up.railway.app/execute"
@@ -38,7 +41,7 @@ cache = {}
 CACHE_TTL = 300  # 5 minutos
 
 def get_cache_key(operation: str, args: dict) -> str:
-    return f"{operation}:{json.dumps(args, sort_keys=True)}"
+    return f"{operation}:{dumps(args, sort_keys=True)}"
 
 # Cliente NocoDB
 class NocoDBClient:
@@ -48,9 +51,10 @@ class NocoDBClient:
         async with aiohttp.ClientSession() as session:
             async with session.post(
                 NOCODB_API,
-                json={'tool': operation, 'args': args}
+                data=dumpb({'tool': operation, 'args': args}),
+                headers={'Content-Type': 'application/json'}
             ) as response:
-                return await response.json()
+                return loads(await response.read())
     
     @staticmethod
     def execute_sync(operation: str, args: dict):
@@ -196,7 +200,7 @@ async def health_check():
 def format_response(data: dict, format_type: str) -> Any:
     """Formata resposta conforme solicitado pelo agente"""
     if format_type == "text":
-        return {"text": json.dumps(data, indent=2)}
+        return {"text": dumps(data, indent=True)}
     elif format_type == "structured":
         # Formato estruturado para processamento
         if "result" in data and "list" in data["result"]:
@@ -225,7 +229,6 @@ async def log_requests(request, call_next):
 
 # WebSocket para agentes em tempo real
 from fastapi import WebSocket
-import json
 
 @app.websocket("/agent/stream")
 async def websocket_endpoint(websocket: WebSocket):
@@ -235,7 +238,7 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             # Receber mensagem do agente
             data = await websocket.receive_text()
-            request = json.loads(data)
+            request = loads(data)
             
             # Processar requisição
             result = await NocoDBClient.execute_async(
@@ -244,7 +247,7 @@ async def websocket_endpoint(websocket: WebSocket):
             )
             
             # Enviar resposta
-            await websocket.send_text(json.dumps(result))
+            await websocket.send_text(dumps(result))
     except Exception as e:
         await websocket.close()
 
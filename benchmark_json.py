@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: stdlib json vs the nocodb_json serializer on a 10k-record list_records page
+
+Usage: python benchmark_json.py [--records 10000] [--rounds 20]
+"""
+
+import argparse
+import json
+import random
+import time
+
+import nocodb_json
+
+
+def build_page(records: int) -> dict:
+    random.seed(42)
+    rows = [
+        {
+            "Id": i,
+            "Title": f"Pedido {i}",
+            "Email": f"cliente{i}@example.com",
+            "Status": random.choice(["Aberto", "Pago", "Cancelado"]),
+            "Amount": round(random.uniform(1, 10000), 2),
+            "Quantity": random.randint(1, 50),
+            "Paid": random.random() > 0.5,
+            "Tags": random.sample(["vip", "atacado", "varejo", "promo", "novo"], 2),
+            "Address": {"city": "São Paulo", "zip": f"{random.randint(10000, 99999)}-000"},
+            "Notes": None,
+            "CreatedAt": "2024-05-01 12:00:00+00:00",
+            "UpdatedAt": "2024-05-02 08:30:00+00:00"
+        }
+        for i in range(1, records + 1)
+    ]
+    return {"list": rows, "pageInfo": {"totalRows": records, "page": 1, "pageSize": records, "isLastPage": True}}
+
+
+def timed(fn, rounds: int) -> float:
+    """Best-of-N wall time in milliseconds"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=20)
+    options = parser.parse_args()
+
+    page = build_page(options.records)
+    stdlib_text = json.dumps(page)
+    fast_bytes = nocodb_json.dumpb(page)
+
+    results = [
+        ("encode", timed(lambda: json.dumps(page).encode(), options.rounds),
+         timed(lambda: nocodb_json.dumpb(page), options.rounds)),
+        ("decode", timed(lambda: json.loads(stdlib_text), options.rounds),
+         timed(lambda: nocodb_json.loads(fast_bytes), options.rounds)),
+    ]
+
+    print(f"{options.records} records, {len(stdlib_text) / 1024:.0f} KiB (stdlib) / "
+          f"{len(fast_bytes) / 1024:.0f} KiB ({nocodb_json.JSON_BACKEND}), best of {options.rounds}")
+    print(f"{'':8}{'stdlib json':>14}{nocodb_json.JSON_BACKEND:>14}{'saved':>12}{'speedup':>10}")
+    for name, stdlib_ms, fast_ms in results:
+        print(f"{name:8}{stdlib_ms:>12.2f}ms{fast_ms:>12.2f}ms{stdlib_ms - fast_ms:>10.2f}ms"
+              f"{stdlib_ms / fast_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
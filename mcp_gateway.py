@@ -2,7 +2,6 @@
 MCP Gateway Universal - Gerencia múltiplos MCP servers e expõe via API REST
 """
 
-import json
 import asyncio
 import subprocess
 import sys
@@ -16,11 +15,13 @@ import yaml
 import os
 from pathlib import Path
 
+from nocodb_json import FastJSONResponse, dumps, loads
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="MCP Gateway Universal", version="1.0.0")
+app = FastAPI(title="MCP Gateway Universal", version="1.0.0", default_response_class=FastJSONResponse)
 
 # Modelos
 class MCPRequest(BaseModel):
@@ -161,7 +162,7 @@ class MCPServerManager:
         
         try:
             # Enviar mensagem para o servidor
-            message_str = json.dumps(message) + "\n"
+            message_str = dumps(message) + "\n"
             process.stdin.write(message_str)
             process.stdin.flush()
             
@@ -170,7 +171,7 @@ class MCPServerManager:
             if not response_str:
                 raise Exception("Sem resposta do servidor")
             
-            response = json.loads(response_str)
+            response = loads(response_str)
             
             if "error" in response:
                 raise Exception(response["error"])
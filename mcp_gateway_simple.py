@@ -2,7 +2,6 @@
 MCP Gateway Simplificado - Versão que funciona com stdio pipes
 """
 
-import json
 import asyncio
 import subprocess
 import sys
@@ -17,11 +16,13 @@ import os
 from pathlib import Path
 import uuid
 
+from nocodb_json import FastJSONResponse, JSONDecodeError, dumps, loads
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="MCP Gateway", version="1.0.0")
+app = FastAPI(title="MCP Gateway", version="1.0.0", default_response_class=FastJSONResponse)
 
 # Modelos
 class MCPRequest(BaseModel):
@@ -118,7 +119,7 @@ class MCPClient:
     
     async def _send_message(self, message: dict):
         """Envia mensagem para o servidor MCP"""
-        message_str = json.dumps(message) + "\n"
+        message_str = dumps(message) + "\n"
         self.process.stdin.write(message_str)
         self.process.stdin.flush()
         logger.debug(f"Enviado para {self.name}: {message_str.strip()}")
@@ -136,9 +137,9 @@ class MCPClient:
             # Alguns servidores MCP podem incluir headers antes do JSON
             json_start = line.find('{')
             if json_start >= 0:
-                return json.loads(line[json_start:])
-            return json.loads(line)
-        except json.JSONDecodeError:
+                return loads(line[json_start:])
+            return loads(line)
+        except JSONDecodeError:
             logger.error(f"Erro ao decodificar JSON: {line}")
             raise
     
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+NocoDB MCP Server (asyncio) - mesma interface do mcp_nocodb_server_full.py
+
+Lê o stdin com um StreamReader, usa um único httpx.AsyncClient com pool de
+conexões e executa cada requisição JSON-RPC como uma task, de modo que um único
+processo mantém dezenas de chamadas ao NocoDB em andamento. As respostas são
+enviadas conforme terminam, identificadas pelo id.
+
+As ferramentas são as do NocoDBMCPServer: os handlers que apenas repassam
+_make_request devolvem aqui uma coroutine, que é aguardada antes da resposta.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from mcp_nocodb_server_full import (NOCODB_MCP_RESOURCE_POLL_INTERVAL, TOOL_REGISTRY, NocoDBMCPServer,
+                                    current_progress)
+from nocodb_aggregate import Aggregator
+from nocodb_json import JSONDecodeError, dumps, loads
+from nocodb_pagination import next_cursor
+from nocodb_resources import BASES_URI, resource_endpoint, tables_uri
+from nocodb_tools import ToolArgumentError
+from nocodb_where import parse_where
+
+logger = logging.getLogger(__name__)
+
+# Requisições em andamento ao mesmo tempo
+NOCODB_MCP_ASYNC_CONCURRENCY = int(os.getenv("NOCODB_MCP_ASYNC_CONCURRENCY", "64"))
+
+# Pool de conexões com o NocoDB
+NOCODB_POOL_MAX_CONNECTIONS = int(os.getenv("NOCODB_POOL_MAX_CONNECTIONS", "100"))
+NOCODB_POOL_MAX_KEEPALIVE = int(os.getenv("NOCODB_POOL_MAX_KEEPALIVE", "20"))
+NOCODB_TIMEOUT = float(os.getenv("NOCODB_TIMEOUT", "30"))
+
+# Linhas JSON-RPC maiores que o limite padrão de 64 KiB do StreamReader (ex.: bulk_create_records)
+STDIN_LINE_LIMIT = 16 * 1024 * 1024
+
+
+class AsyncNocoDBMCPServer(NocoDBMCPServer):
+    def __init__(self):
+        super().__init__()
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=NOCODB_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=NOCODB_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=NOCODB_POOL_MAX_KEEPALIVE
+            )
+        )
+
+    async def process_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        method = message.get("method")
+        if method not in self.handlers:
+            return super().process_message(message)
+        result = self.handlers[method](message.get("params", {}))
+        if inspect.isawaitable(result):
+            result = await result
+        return {
+            "jsonrpc": "2.0",
+            "id": message.get("id"),
+            "result": result
+        }
+
+    async def handle_tools_call(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        tool_name = params.get("name")
+        arguments = dict(params.get("arguments", {}))
+        if_none_match = arguments.pop("if_none_match", None) or params.get("_meta", {}).get("ifNoneMatch")
+
+        handler = self.tool_handlers.get(tool_name)
+        if not handler:
+            return {"error": f"Ferramenta desconhecida: {tool_name}"}
+        try:
+            arguments = TOOL_REGISTRY.validate(tool_name, arguments)
+        except ToolArgumentError as e:
+            return {"error": f"Argumentos inválidos para {tool_name}: {e}"}
+        token = current_progress.set(self._progress(params))
+        try:
+            result = handler(**arguments)
+            if inspect.isawaitable(result):
+                result = await result
+        finally:
+            current_progress.reset(token)
+        if "error" not in result:
+            self._schema_changed(tool_name, arguments)
+        return self._tool_result(tool_name, result, if_none_match)
+
+    # Recursos
+    async def handle_resources_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            bases = loads(await self._resource(BASES_URI)).get("list", [])
+        except (ValueError, RuntimeError) as e:
+            return {"error": str(e)}
+        tables = {}
+        for base in bases:
+            try:
+                tables[base["id"]] = loads(await self._resource(tables_uri(base["id"]))).get("list", [])
+            except (ValueError, RuntimeError) as e:
+                logger.error(f"Falha ao listar as tabelas da base {base['id']}: {e}")
+        return {"resources": self._resource_listing(bases, tables)}
+
+    async def handle_resources_read(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        uri = params.get("uri")
+        try:
+            text = await self._resource(uri)
+        except (ValueError, RuntimeError) as e:
+            return {"error": str(e)}
+        return {"contents": [{"uri": uri, "mimeType": "application/json", "text": text}]}
+
+    async def handle_resources_subscribe(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        uri = params.get("uri")
+        try:
+            await self._resource(uri)
+        except (ValueError, RuntimeError) as e:
+            return {"error": str(e)}
+        self.resources.subscribe(uri)
+        return {}
+
+    async def _resource(self, uri: str) -> str:
+        text = self.resources.get(uri)
+        if text is None:
+            text = await self._fetch_resource(uri)
+            self._store_resource(uri, text)
+        return text
+
+    async def _fetch_resource(self, uri: str) -> str:
+        return self._resource_text(await self._make_request("GET", resource_endpoint(uri)))
+
+    async def _poll_resources(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            for uri in self.resources.subscribed():
+                try:
+                    self._store_resource(uri, await self._fetch_resource(uri))
+                except (ValueError, RuntimeError) as e:
+                    logger.error(f"Falha ao reler o recurso {uri}: {e}")
+
+    # Métodos de API do NocoDB
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Any] = None,
+                            params: Optional[Dict] = None,
+                            transform: Optional[Callable[[Any], Any]] = None) -> Dict[str, Any]:
+        if method not in ("GET", "POST", "PUT", "PATCH", "DELETE"):
+            return {"error": f"Método HTTP não suportado: {method}"}
+        try:
+            if method == "GET":
+                response = await self.client.get(endpoint, params=params)
+            else:
+                response = await self.client.request(method, endpoint, json=data)
+            return self._response_result(response, transform)
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def _run_chunks(self, steps) -> Dict[str, Any]:
+        result = None
+        try:
+            while True:
+                result = await self._make_request(**steps.send(result))
+        except StopIteration as done:
+            return done.value
+
+    async def _iter_pages(self, table_id: str, fields: Optional[List[str]] = None, where: str = ""):
+        """Percorre a tabela inteira por cursor (Id), uma página por vez"""
+        cursor = None
+        while True:
+            params, state = self._page_params(fields, where, cursor)
+            response = await self.client.get(f"/tables/{table_id}/records", params=params)
+            if response.status_code != 200:
+                raise RuntimeError(f"Erro na requisição: {response.status_code} - {response.text}")
+            page = loads(response.content)
+            rows = page.get("list", [])
+            yield rows
+            cursor = next_cursor(rows, state, page.get("pageInfo"))
+            if not cursor:
+                break
+
+    # Handlers que processam o resultado de _make_request
+    async def _update_record(self, table_id: str, record_id: str, data: Dict) -> Dict[str, Any]:
+        result = await self._make_request("PATCH", f"/tables/{table_id}/records/{record_id}", data)
+        if self.search_index and "error" not in result:
+            self.search_index.update(table_id, record_id, data)
+        return result
+
+    async def _delete_record(self, table_id: str, record_id: str) -> Dict[str, Any]:
+        result = await self._make_request("DELETE", f"/tables/{table_id}/records/{record_id}")
+        if self.search_index and "error" not in result:
+            self.search_index.remove(table_id, [record_id])
+        return result
+
+    async def _aggregate_records(self, table_id: str, aggregates: List[str], group_by: List[str] = None,
+                                 where: str = "") -> Dict[str, Any]:
+        try:
+            aggregator = Aggregator(group_by or [], aggregates)
+            parse_where(where)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        progress = current_progress.get()
+        try:
+            async for rows in self._iter_pages(table_id, aggregator.fields() or ["Id"], where):
+                aggregator.add(rows)
+                if progress:
+                    progress.update(aggregator.rows_scanned, message=f"{aggregator.rows_scanned} registros agregados")
+        except Exception as e:
+            return {"error": str(e)}
+        return {"content": [{"type": "text", "text": dumps(aggregator.result())}]}
+
+    async def _build_search_index(self):
+        for table_id in sorted(self.search_index.tables - self.search_index.loaded):
+            try:
+                async for rows in self._iter_pages(table_id):
+                    self.search_index.add(table_id, rows)
+                self.search_index.loaded.add(table_id)
+                logger.info(f"Índice de pesquisa da tabela {table_id} carregado")
+            except Exception as e:
+                logger.error(f"Falha ao indexar a tabela {table_id} para pesquisa: {e}")
+
+    async def _base_tables(self, base_id: str) -> set:
+        return {table["id"] for table in loads(await self._resource(tables_uri(base_id))).get("list", [])}
+
+    async def _global_search(self, base_id: str, query: str, limit: int = 25, remote: bool = False) -> Dict[str, Any]:
+        if self.search_index and not remote:
+            try:
+                tables = await self._base_tables(base_id)
+            except (ValueError, RuntimeError) as e:
+                logger.error(f"Falha ao listar as tabelas da base {base_id}, usando o NocoDB: {e}")
+            else:
+                if tables and tables <= self.search_index.loaded:
+                    hits = self.search_index.search(query, limit, sorted(tables))
+                    return {"content": [{"type": "text", "text": dumps({"list": hits, "source": "index"})}]}
+        params = {"query": query}
+        return await self._make_request("GET", f"/meta/bases/{base_id}/search", params=params)
+
+    # Loop stdio
+    def _write(self, message: Dict[str, Any]):
+        sys.stdout.write(dumps(message) + "\n")
+        sys.stdout.flush()
+
+    async def _dispatch(self, message: Any, slots: asyncio.Semaphore):
+        try:
+            self._write(await self.process_message(message))
+        except Exception as e:
+            logger.error(f"Erro inesperado: {str(e)}")
+            self._write({
+                "jsonrpc": "2.0",
+                "id": message.get("id") if isinstance(message, dict) else None,
+                "error": {
+                    "code": -32603,
+                    "message": f"Erro interno: {str(e)}"
+                }
+            })
+        finally:
+            slots.release()
+
+    async def run(self, concurrency: Optional[int] = None):
+        concurrency = max(1, concurrency or NOCODB_MCP_ASYNC_CONCURRENCY)
+        slots = asyncio.Semaphore(concurrency)
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=STDIN_LINE_LIMIT)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        logger.info(f"Servidor MCP NocoDB (asyncio) iniciado ({concurrency} requisições simultâneas)")
+
+        tasks = set()
+        poller = None
+        if NOCODB_MCP_RESOURCE_POLL_INTERVAL > 0:
+            poller = asyncio.create_task(self._poll_resources(NOCODB_MCP_RESOURCE_POLL_INTERVAL))
+        indexer = asyncio.create_task(self._build_search_index()) if self.search_index else None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = loads(line.strip())
+                except JSONDecodeError as e:
+                    self._write({
+                        "jsonrpc": "2.0",
+                        "error": {
+                            "code": -32700,
+                            "message": f"Erro de parse: {str(e)}"
+                        }
+                    })
+                    continue
+                await slots.acquire()
+                task = asyncio.create_task(self._dispatch(message, slots))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            # Fim do stdin: termina as requisições em andamento antes de sair
+            await asyncio.gather(*tasks)
+        finally:
+            if poller:
+                poller.cancel()
+            if indexer:
+                indexer.cancel()
+            await self.client.aclose()
+
+
+if __name__ == "__main__":
+    server = AsyncNocoDBMCPServer()
+    asyncio.run(server.run())
@@ -4,12 +4,26 @@ NocoDB MCP Server - Servidor completo para integração com NocoDB
 Inclui todas as principais funções da API
 """
 
-import json
 import sys
 import logging
 import os
+import threading
+import time
 import requests
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Generator, List, Optional
+
+from nocodb_aggregate import Aggregator
+from nocodb_cache import content_etag, etag_matches
+from nocodb_json import JSONDecodeError, dumps, fragment, loads
+from nocodb_format import RECORD_FORMATS, format_records
+from nocodb_pagination import cursor_fields, keyset_query, next_cursor
+from nocodb_resources import (BASES_URI, LIST_CHANGING_TOOLS, ResourceSnapshots, resource_endpoint, schema_uri,
+                              stale_resources, tables_uri)
+from nocodb_search import SearchIndex
+from nocodb_tools import ToolArgumentError, ToolRegistry
+from nocodb_where import WhereSyntaxError, parse_where
 
 # Configuração do logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -19,710 +33,888 @@ logger = logging.getLogger(__name__)
 NOCODB_BASE_URL = os.getenv("NOCODB_BASE_URL", "https://nocodb.plataforma.app/api/v2")
 NOCODB_API_KEY = os.getenv("NOCODB_API_KEY", "")
 
-class NocoDBMCPServer:
-    def __init__(self):
-        self.base_url = NOCODB_BASE_URL
-        self.api_key = NOCODB_API_KEY
-        self.headers = {
-            "xc-token": self.api_key,
-            "Content-Type": "application/json"
+# Tamanho das páginas lidas por aggregate_records e pela indexação
+AGGREGATE_PAGE_SIZE = int(os.getenv("NOCODB_EXPORT_PAGE_SIZE", "1000"))
+
+# Como o corpo das respostas do NocoDB chega ao cliente:
+#   text       - decodificado e recodificado como texto (padrão)
+#   raw        - bytes repassados como texto, sem decodificar (quando a ferramenta não transforma o resultado)
+#   structured - como raw, e também como objeto JSON em structuredContent
+RESPONSE_MODES = ("text", "raw", "structured")
+NOCODB_MCP_RESPONSE_MODE = os.getenv("NOCODB_MCP_RESPONSE_MODE", "text")
+
+# Requisições processadas em paralelo pelo loop stdio
+NOCODB_MCP_CONCURRENCY = int(os.getenv("NOCODB_MCP_CONCURRENCY", "8"))
+
+# Com progressToken (params._meta) em tools/call, list_records e as operações em lote com mais
+# registros que isto são feitos em partes, com notifications/progress após cada uma
+NOCODB_MCP_CHUNK_SIZE = int(os.getenv("NOCODB_MCP_CHUNK_SIZE", "100"))
+
+# Índice local de pesquisa (IDs de tabela separados por vírgula; vazio desativa)
+NOCODB_SEARCH_TABLES = [t.strip() for t in os.getenv("NOCODB_SEARCH_TABLES", "").split(",") if t.strip()]
+
+# Recursos (esquema de bases e tabelas): validade dos snapshots locais, em segundos, e intervalo
+# em que os recursos assinados (resources/subscribe) são relidos no NocoDB; 0 desativa a releitura
+NOCODB_MCP_RESOURCE_TTL = float(os.getenv("NOCODB_MCP_RESOURCE_TTL", "300"))
+NOCODB_MCP_RESOURCE_POLL_INTERVAL = float(os.getenv("NOCODB_MCP_RESOURCE_POLL_INTERVAL", "60"))
+
+RESOURCE_TEMPLATES = [
+    {
+        "uriTemplate": "nocodb://base/{base_id}/tables",
+        "name": "Tabelas da base",
+        "description": "Tabelas de uma base do NocoDB",
+        "mimeType": "application/json"
+    },
+    {
+        "uriTemplate": "nocodb://base/{base_id}/table/{table_id}/schema",
+        "name": "Esquema da tabela",
+        "description": "Metadados de uma tabela, com suas colunas",
+        "mimeType": "application/json"
+    }
+]
+
+# Ferramentas somente leitura: respostas recebem ETag (_meta.etag) e aceitam if_none_match
+READ_ONLY_TOOLS = {
+    "get_info", "list_bases", "get_base", "list_tables", "get_table", "list_columns",
+    "list_records", "get_record", "list_views", "list_webhooks", "global_search", "aggregate_records"
+}
+IF_NONE_MATCH_SCHEMA = {
+    "type": "string",
+    "description": "ETag (_meta.etag) de uma resposta anterior; se nada mudou a resposta é apenas 'Sem alterações'"
+}
+
+# Declaração das ferramentas (tools/list); os argumentos de cada chamada são validados pelo inputSchema
+TOOLS = [
+    # Informações do sistema
+    {
+        "name": "get_info",
+        "description": "Obter informações sobre o servidor NocoDB",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
         }
-        
-        # Mapeamento de métodos
-        self.handlers = {
-            "initialize": self.handle_initialize,
-            "tools/list": self.handle_tools_list,
-            "tools/call": self.handle_tools_call,
-            "resources/list": self.handle_resources_list,
-            "resources/read": self.handle_resources_read
+    },
+
+    # Gerenciamento de Bases
+    {
+        "name": "list_bases",
+        "description": "Listar todas as bases no NocoDB",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "get_base",
+        "description": "Obter detalhes de uma base específica",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "base_id": {
+                    "type": "string",
+                    "description": "ID da base"
+                }
+            },
+            "required": ["base_id"]
+        }
+    },
+    {
+        "name": "create_base",
+        "description": "Criar uma nova base",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "title": {
+                    "type": "string",
+                    "description": "Nome da base"
+                },
+                "description": {
+                    "type": "string",
+                    "description": "Descrição da base"
+                }
+            },
+            "required": ["title"]
+        }
+    },
+    {
+        "name": "update_base",
+        "description": "Atualizar uma base existente",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "base_id": {
+                    "type": "string",
+                    "description": "ID da base"
+                },
+                "title": {
+                    "type": "string",
+                    "description": "Novo nome da base"
+                },
+                "description": {
+                    "type": "string",
+                    "description": "Nova descrição da base"
+                }
+            },
+            "required": ["base_id"]
         }
+    },
+    {
+        "name": "delete_base",
+        "description": "Deletar uma base",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "base_id": {
+                    "type": "string",
+                    "description": "ID da base"
+                }
+            },
+            "required": ["base_id"]
+        }
+    },
 
-    def handle_initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        return {
-            "protocolVersion": "2024-11-05",
-            "capabilities": {
-                "tools": {},
-                "resources": {
-                    "read": True,
-                    "write": False
+    # Gerenciamento de Tabelas
+    {
+        "name": "list_tables",
+        "description": "Listar tabelas de uma base",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "base_id": {
+                    "type": "string",
+                    "description": "ID da base"
                 }
             },
-            "serverInfo": {
-                "name": "nocodb-mcp-server",
-                "version": "3.0.0",
-                "description": "Servidor MCP completo para integração com todas as funções do NocoDB"
-            }
+            "required": ["base_id"]
+        }
+    },
+    {
+        "name": "get_table",
+        "description": "Obter detalhes de uma tabela",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
+                }
+            },
+            "required": ["table_id"]
         }
+    },
+    {
+        "name": "create_table",
+        "description": "Criar uma nova tabela",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "base_id": {
+                    "type": "string",
+                    "description": "ID da base"
+                },
+                "title": {
+                    "type": "string",
+                    "description": "Nome da tabela"
+                },
+                "columns": {
+                    "type": "array",
+                    "description": "Lista de colunas da tabela"
+                }
+            },
+            "required": ["base_id", "title"]
+        }
+    },
+    {
+        "name": "update_table",
+        "description": "Atualizar uma tabela",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
+                },
+                "title": {
+                    "type": "string",
+                    "description": "Novo nome da tabela"
+                }
+            },
+            "required": ["table_id", "title"]
+        }
+    },
+    {
+        "name": "delete_table",
+        "description": "Deletar uma tabela",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
+                }
+            },
+            "required": ["table_id"]
+        }
+    },
 
-    def handle_tools_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        return {
-            "tools": [
-                # Informações do sistema
-                {
-                    "name": "get_info",
-                    "description": "Obter informações sobre o servidor NocoDB",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {}
-                    }
+    # Gerenciamento de Colunas
+    {
+        "name": "list_columns",
+        "description": "Listar colunas de uma tabela",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
+                }
+            },
+            "required": ["table_id"]
+        }
+    },
+    {
+        "name": "create_column",
+        "description": "Criar uma nova coluna",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
                 },
-                
-                # Gerenciamento de Bases
-                {
-                    "name": "list_bases",
-                    "description": "Listar todas as bases no NocoDB",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {}
-                    }
+                "title": {
+                    "type": "string",
+                    "description": "Nome da coluna"
                 },
-                {
-                    "name": "get_base",
-                    "description": "Obter detalhes de uma base específica",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "base_id": {
-                                "type": "string",
-                                "description": "ID da base"
-                            }
-                        },
-                        "required": ["base_id"]
-                    }
+                "column_type": {
+                    "type": "string",
+                    "description": "Tipo da coluna (SingleLineText, LongText, Number, etc.)"
+                }
+            },
+            "required": ["table_id", "title", "column_type"]
+        }
+    },
+    {
+        "name": "update_column",
+        "description": "Atualizar uma coluna",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "column_id": {
+                    "type": "string",
+                    "description": "ID da coluna"
                 },
-                {
-                    "name": "create_base",
-                    "description": "Criar uma nova base",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "title": {
-                                "type": "string",
-                                "description": "Nome da base"
-                            },
-                            "description": {
-                                "type": "string",
-                                "description": "Descrição da base"
-                            }
-                        },
-                        "required": ["title"]
-                    }
+                "title": {
+                    "type": "string",
+                    "description": "Novo nome da coluna"
+                }
+            },
+            "required": ["column_id", "title"]
+        }
+    },
+    {
+        "name": "delete_column",
+        "description": "Deletar uma coluna",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "column_id": {
+                    "type": "string",
+                    "description": "ID da coluna"
+                }
+            },
+            "required": ["column_id"]
+        }
+    },
+
+    # Gerenciamento de Registros
+    {
+        "name": "list_records",
+        "description": "Listar registros de uma tabela",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
                 },
-                {
-                    "name": "update_base",
-                    "description": "Atualizar uma base existente",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "base_id": {
-                                "type": "string",
-                                "description": "ID da base"
-                            },
-                            "title": {
-                                "type": "string",
-                                "description": "Novo nome da base"
-                            },
-                            "description": {
-                                "type": "string",
-                                "description": "Nova descrição da base"
-                            }
-                        },
-                        "required": ["base_id"]
-                    }
+                "limit": {
+                    "type": "integer",
+                    "description": "Número máximo de registros",
+                    "default": 50
                 },
-                {
-                    "name": "delete_base",
-                    "description": "Deletar uma base",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "base_id": {
-                                "type": "string",
-                                "description": "ID da base"
-                            }
-                        },
-                        "required": ["base_id"]
-                    }
+                "offset": {
+                    "type": "integer",
+                    "description": "Offset para paginação",
+                    "default": 0
                 },
-                
-                # Gerenciamento de Tabelas
-                {
-                    "name": "list_tables",
-                    "description": "Listar tabelas de uma base",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "base_id": {
-                                "type": "string",
-                                "description": "ID da base"
-                            }
-                        },
-                        "required": ["base_id"]
-                    }
+                "where": {
+                    "type": "string",
+                    "description": "Filtro WHERE",
+                    "default": ""
                 },
-                {
-                    "name": "get_table",
-                    "description": "Obter detalhes de uma tabela",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            }
-                        },
-                        "required": ["table_id"]
-                    }
+                "sort": {
+                    "type": "string",
+                    "description": "Ordenação dos resultados"
                 },
-                {
-                    "name": "create_table",
-                    "description": "Criar uma nova tabela",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "base_id": {
-                                "type": "string",
-                                "description": "ID da base"
-                            },
-                            "title": {
-                                "type": "string",
-                                "description": "Nome da tabela"
-                            },
-                            "columns": {
-                                "type": "array",
-                                "description": "Lista de colunas da tabela"
-                            }
-                        },
-                        "required": ["base_id", "title"]
-                    }
+                "pagination": {
+                    "type": "string",
+                    "description": "Modo de paginação: offset ou cursor (por chave numérica, usa o primeiro campo de sort ou Id)",
+                    "default": "offset"
                 },
-                {
-                    "name": "update_table",
-                    "description": "Atualizar uma tabela",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            },
-                            "title": {
-                                "type": "string",
-                                "description": "Novo nome da tabela"
-                            }
-                        },
-                        "required": ["table_id"]
-                    }
+                "cursor": {
+                    "type": "string",
+                    "description": "Valor next_cursor da página anterior (modo cursor)"
                 },
-                {
-                    "name": "delete_table",
-                    "description": "Deletar uma tabela",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            }
-                        },
-                        "required": ["table_id"]
-                    }
+                "format": {
+                    "type": "string",
+                    "description": "Formato da resposta: rows (padrão) ou columnar (lista de colunas e um array por coluna)",
+                    "default": "rows"
                 },
-                
-                # Gerenciamento de Colunas
-                {
-                    "name": "list_columns",
-                    "description": "Listar colunas de uma tabela",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            }
-                        },
-                        "required": ["table_id"]
-                    }
+                "exclude_system_fields": {
+                    "type": "boolean",
+                    "description": "Remover campos de sistema do NocoDB (CreatedAt, UpdatedAt, nc_*)",
+                    "default": False
+                }
+            },
+            "required": ["table_id"]
+        }
+    },
+    {
+        "name": "get_record",
+        "description": "Obter um registro específico",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
                 },
-                {
-                    "name": "create_column",
-                    "description": "Criar uma nova coluna",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            },
-                            "title": {
-                                "type": "string",
-                                "description": "Nome da coluna"
-                            },
-                            "column_type": {
-                                "type": "string",
-                                "description": "Tipo da coluna (SingleLineText, LongText, Number, etc.)"
-                            }
-                        },
-                        "required": ["table_id", "title", "column_type"]
-                    }
+                "record_id": {
+                    "type": "string",
+                    "description": "ID do registro"
+                }
+            },
+            "required": ["table_id", "record_id"]
+        }
+    },
+    {
+        "name": "create_record",
+        "description": "Criar um novo registro",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
                 },
-                {
-                    "name": "update_column",
-                    "description": "Atualizar uma coluna",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "column_id": {
-                                "type": "string",
-                                "description": "ID da coluna"
-                            },
-                            "title": {
-                                "type": "string",
-                                "description": "Novo nome da coluna"
-                            }
-                        },
-                        "required": ["column_id"]
-                    }
+                "data": {
+                    "type": "object",
+                    "description": "Dados do registro a criar"
+                }
+            },
+            "required": ["table_id", "data"]
+        }
+    },
+    {
+        "name": "update_record",
+        "description": "Atualizar um registro existente",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
                 },
-                {
-                    "name": "delete_column",
-                    "description": "Deletar uma coluna",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "column_id": {
-                                "type": "string",
-                                "description": "ID da coluna"
-                            }
-                        },
-                        "required": ["column_id"]
-                    }
+                "record_id": {
+                    "type": "string",
+                    "description": "ID do registro"
                 },
-                
-                # Gerenciamento de Registros
-                {
-                    "name": "list_records",
-                    "description": "Listar registros de uma tabela",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Número máximo de registros",
-                                "default": 50
-                            },
-                            "offset": {
-                                "type": "integer",
-                                "description": "Offset para paginação",
-                                "default": 0
-                            },
-                            "where": {
-                                "type": "string",
-                                "description": "Filtro WHERE",
-                                "default": ""
-                            },
-                            "sort": {
-                                "type": "string",
-                                "description": "Ordenação dos resultados"
-                            }
-                        },
-                        "required": ["table_id"]
-                    }
+                "data": {
+                    "type": "object",
+                    "description": "Dados para atualizar"
+                }
+            },
+            "required": ["table_id", "record_id", "data"]
+        }
+    },
+    {
+        "name": "delete_record",
+        "description": "Deletar um registro",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
                 },
-                {
-                    "name": "get_record",
-                    "description": "Obter um registro específico",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            },
-                            "record_id": {
-                                "type": "string",
-                                "description": "ID do registro"
-                            }
-                        },
-                        "required": ["table_id", "record_id"]
-                    }
+                "record_id": {
+                    "type": "string",
+                    "description": "ID do registro"
+                }
+            },
+            "required": ["table_id", "record_id"]
+        }
+    },
+    {
+        "name": "bulk_create_records",
+        "description": "Criar múltiplos registros de uma vez",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
                 },
-                {
-                    "name": "create_record",
-                    "description": "Criar um novo registro",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            },
-                            "data": {
-                                "type": "object",
-                                "description": "Dados do registro a criar"
-                            }
-                        },
-                        "required": ["table_id", "data"]
-                    }
+                "records": {
+                    "type": "array",
+                    "description": "Lista de registros para criar"
+                }
+            },
+            "required": ["table_id", "records"]
+        }
+    },
+    {
+        "name": "bulk_update_records",
+        "description": "Atualizar múltiplos registros de uma vez",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
                 },
-                {
-                    "name": "update_record",
-                    "description": "Atualizar um registro existente",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            },
-                            "record_id": {
-                                "type": "string",
-                                "description": "ID do registro"
-                            },
-                            "data": {
-                                "type": "object",
-                                "description": "Dados para atualizar"
-                            }
-                        },
-                        "required": ["table_id", "record_id", "data"]
-                    }
+                "records": {
+                    "type": "array",
+                    "description": "Lista de registros para atualizar"
+                }
+            },
+            "required": ["table_id", "records"]
+        }
+    },
+    {
+        "name": "bulk_delete_records",
+        "description": "Deletar múltiplos registros de uma vez",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
                 },
-                {
-                    "name": "delete_record",
-                    "description": "Deletar um registro",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            },
-                            "record_id": {
-                                "type": "string",
-                                "description": "ID do registro"
-                            }
-                        },
-                        "required": ["table_id", "record_id"]
-                    }
+                "record_ids": {
+                    "type": "array",
+                    "description": "Lista de IDs dos registros para deletar"
+                }
+            },
+            "required": ["table_id", "record_ids"]
+        }
+    },
+    {
+        "name": "aggregate_records",
+        "description": "Agrupar registros e calcular count/sum/avg/min/max sem trazer os registros",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
                 },
-                {
-                    "name": "bulk_create_records",
-                    "description": "Criar múltiplos registros de uma vez",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            },
-                            "records": {
-                                "type": "array",
-                                "description": "Lista de registros para criar"
-                            }
-                        },
-                        "required": ["table_id", "records"]
-                    }
+                "aggregates": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Agregações no formato op(Campo), ex.: sum(Valor), avg(Preco), count(*)"
                 },
-                {
-                    "name": "bulk_update_records",
-                    "description": "Atualizar múltiplos registros de uma vez",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            },
-                            "records": {
-                                "type": "array",
-                                "description": "Lista de registros para atualizar"
-                            }
-                        },
-                        "required": ["table_id", "records"]
-                    }
+                "group_by": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Campos de agrupamento"
                 },
-                {
-                    "name": "bulk_delete_records",
-                    "description": "Deletar múltiplos registros de uma vez",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            },
-                            "record_ids": {
-                                "type": "array",
-                                "description": "Lista de IDs dos registros para deletar"
-                            }
-                        },
-                        "required": ["table_id", "record_ids"]
-                    }
+                "where": {
+                    "type": "string",
+                    "description": "Filtro WHERE",
+                    "default": ""
+                }
+            },
+            "required": ["table_id", "aggregates"]
+        }
+    },
+
+    # Gerenciamento de Views
+    {
+        "name": "list_views",
+        "description": "Listar views de uma tabela",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
+                }
+            },
+            "required": ["table_id"]
+        }
+    },
+    {
+        "name": "create_view",
+        "description": "Criar uma nova view",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
+                },
+                "title": {
+                    "type": "string",
+                    "description": "Nome da view"
+                },
+                "type": {
+                    "type": "string",
+                    "description": "Tipo da view (grid, gallery, form, etc.)"
+                }
+            },
+            "required": ["table_id", "title", "type"]
+        }
+    },
+    {
+        "name": "update_view",
+        "description": "Atualizar uma view",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "view_id": {
+                    "type": "string",
+                    "description": "ID da view"
                 },
-                
-                # Gerenciamento de Views
-                {
-                    "name": "list_views",
-                    "description": "Listar views de uma tabela",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            }
-                        },
-                        "required": ["table_id"]
-                    }
+                "title": {
+                    "type": "string",
+                    "description": "Novo nome da view"
+                }
+            },
+            "required": ["view_id", "title"]
+        }
+    },
+    {
+        "name": "delete_view",
+        "description": "Deletar uma view",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "view_id": {
+                    "type": "string",
+                    "description": "ID da view"
+                }
+            },
+            "required": ["view_id"]
+        }
+    },
+
+    # Operações de Filtro
+    {
+        "name": "create_filter",
+        "description": "Criar um filtro para uma view",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "view_id": {
+                    "type": "string",
+                    "description": "ID da view"
                 },
-                {
-                    "name": "create_view",
-                    "description": "Criar uma nova view",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            },
-                            "title": {
-                                "type": "string",
-                                "description": "Nome da view"
-                            },
-                            "type": {
-                                "type": "string",
-                                "description": "Tipo da view (grid, gallery, form, etc.)"
-                            }
-                        },
-                        "required": ["table_id", "title", "type"]
-                    }
+                "field": {
+                    "type": "string",
+                    "description": "Campo para filtrar"
                 },
-                {
-                    "name": "update_view",
-                    "description": "Atualizar uma view",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "view_id": {
-                                "type": "string",
-                                "description": "ID da view"
-                            },
-                            "title": {
-                                "type": "string",
-                                "description": "Novo nome da view"
-                            }
-                        },
-                        "required": ["view_id"]
-                    }
+                "operator": {
+                    "type": "string",
+                    "description": "Operador do filtro"
                 },
-                {
-                    "name": "delete_view",
-                    "description": "Deletar uma view",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "view_id": {
-                                "type": "string",
-                                "description": "ID da view"
-                            }
-                        },
-                        "required": ["view_id"]
-                    }
+                "value": {
+                    "type": "string",
+                    "description": "Valor do filtro"
+                }
+            },
+            "required": ["view_id", "field", "operator", "value"]
+        }
+    },
+
+    # Operações de Ordenação
+    {
+        "name": "create_sort",
+        "description": "Criar ordenação para uma view",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "view_id": {
+                    "type": "string",
+                    "description": "ID da view"
+                },
+                "field": {
+                    "type": "string",
+                    "description": "Campo para ordenar"
+                },
+                "direction": {
+                    "type": "string",
+                    "description": "Direção da ordenação (asc ou desc)"
+                }
+            },
+            "required": ["view_id", "field", "direction"]
+        }
+    },
+
+    # Webhooks
+    {
+        "name": "list_webhooks",
+        "description": "Listar webhooks de uma tabela",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
+                }
+            },
+            "required": ["table_id"]
+        }
+    },
+    {
+        "name": "create_webhook",
+        "description": "Criar um webhook",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
+                },
+                "title": {
+                    "type": "string",
+                    "description": "Nome do webhook"
+                },
+                "event": {
+                    "type": "string",
+                    "description": "Evento (insert, update, delete)"
+                },
+                "url": {
+                    "type": "string",
+                    "description": "URL do webhook"
+                }
+            },
+            "required": ["table_id", "title", "event", "url"]
+        }
+    },
+
+    # Compartilhamento
+    {
+        "name": "share_view",
+        "description": "Compartilhar uma view publicamente",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "view_id": {
+                    "type": "string",
+                    "description": "ID da view"
                 },
-                
-                # Operações de Filtro
-                {
-                    "name": "create_filter",
-                    "description": "Criar um filtro para uma view",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "view_id": {
-                                "type": "string",
-                                "description": "ID da view"
-                            },
-                            "field": {
-                                "type": "string",
-                                "description": "Campo para filtrar"
-                            },
-                            "operator": {
-                                "type": "string",
-                                "description": "Operador do filtro"
-                            },
-                            "value": {
-                                "type": "string",
-                                "description": "Valor do filtro"
-                            }
-                        },
-                        "required": ["view_id", "field", "operator", "value"]
-                    }
+                "password": {
+                    "type": "string",
+                    "description": "Senha para proteger a view (opcional)"
+                }
+            },
+            "required": ["view_id"]
+        }
+    },
+
+    # Pesquisa Global
+    {
+        "name": "global_search",
+        "description": "Pesquisar em todas as tabelas",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "base_id": {
+                    "type": "string",
+                    "description": "ID da base"
                 },
-                
-                # Operações de Ordenação
-                {
-                    "name": "create_sort",
-                    "description": "Criar ordenação para uma view",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "view_id": {
-                                "type": "string",
-                                "description": "ID da view"
-                            },
-                            "field": {
-                                "type": "string",
-                                "description": "Campo para ordenar"
-                            },
-                            "direction": {
-                                "type": "string",
-                                "description": "Direção da ordenação (asc ou desc)"
-                            }
-                        },
-                        "required": ["view_id", "field", "direction"]
-                    }
+                "query": {
+                    "type": "string",
+                    "description": "Termo de pesquisa"
                 },
-                
-                # Webhooks
-                {
-                    "name": "list_webhooks",
-                    "description": "Listar webhooks de uma tabela",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            }
-                        },
-                        "required": ["table_id"]
-                    }
+                "limit": {
+                    "type": "integer",
+                    "description": "Número máximo de resultados do índice local",
+                    "default": 25
                 },
-                {
-                    "name": "create_webhook",
-                    "description": "Criar um webhook",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            },
-                            "title": {
-                                "type": "string",
-                                "description": "Nome do webhook"
-                            },
-                            "event": {
-                                "type": "string",
-                                "description": "Evento (insert, update, delete)"
-                            },
-                            "url": {
-                                "type": "string",
-                                "description": "URL do webhook"
-                            }
-                        },
-                        "required": ["table_id", "title", "event", "url"]
-                    }
+                "remote": {
+                    "type": "boolean",
+                    "description": "Ignorar o índice local (NOCODB_SEARCH_TABLES) e pesquisar no NocoDB",
+                    "default": False
+                }
+            },
+            "required": ["base_id", "query"]
+        }
+    },
+
+    # Comentários
+    {
+        "name": "add_comment",
+        "description": "Adicionar comentário a um registro",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
                 },
-                
-                # Compartilhamento
-                {
-                    "name": "share_view",
-                    "description": "Compartilhar uma view publicamente",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "view_id": {
-                                "type": "string",
-                                "description": "ID da view"
-                            },
-                            "password": {
-                                "type": "string",
-                                "description": "Senha para proteger a view (opcional)"
-                            }
-                        },
-                        "required": ["view_id"]
-                    }
+                "record_id": {
+                    "type": "string",
+                    "description": "ID do registro"
                 },
-                
-                # Pesquisa Global
-                {
-                    "name": "global_search",
-                    "description": "Pesquisar em todas as tabelas",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "base_id": {
-                                "type": "string",
-                                "description": "ID da base"
-                            },
-                            "query": {
-                                "type": "string",
-                                "description": "Termo de pesquisa"
-                            }
-                        },
-                        "required": ["base_id", "query"]
-                    }
+                "comment": {
+                    "type": "string",
+                    "description": "Texto do comentário"
+                }
+            },
+            "required": ["table_id", "record_id", "comment"]
+        }
+    },
+
+    # Arquivo e Upload
+    {
+        "name": "upload_file",
+        "description": "Fazer upload de arquivo",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "table_id": {
+                    "type": "string",
+                    "description": "ID da tabela"
                 },
-                
-                # Comentários
-                {
-                    "name": "add_comment",
-                    "description": "Adicionar comentário a um registro",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            },
-                            "record_id": {
-                                "type": "string",
-                                "description": "ID do registro"
-                            },
-                            "comment": {
-                                "type": "string",
-                                "description": "Texto do comentário"
-                            }
-                        },
-                        "required": ["table_id", "record_id", "comment"]
-                    }
+                "column_id": {
+                    "type": "string",
+                    "description": "ID da coluna de arquivo"
                 },
-                
-                # Arquivo e Upload
-                {
-                    "name": "upload_file",
-                    "description": "Fazer upload de arquivo",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "table_id": {
-                                "type": "string",
-                                "description": "ID da tabela"
-                            },
-                            "column_id": {
-                                "type": "string",
-                                "description": "ID da coluna de arquivo"
-                            },
-                            "file_url": {
-                                "type": "string",
-                                "description": "URL do arquivo para upload"
-                            }
-                        },
-                        "required": ["table_id", "column_id", "file_url"]
-                    }
+                "file_url": {
+                    "type": "string",
+                    "description": "URL do arquivo para upload"
+                }
+            },
+            "required": ["table_id", "column_id", "file_url"]
+        }
+    }
+]
+for _tool in TOOLS:
+    if _tool["name"] in READ_ONLY_TOOLS:
+        _tool["inputSchema"]["properties"]["if_none_match"] = IF_NONE_MATCH_SCHEMA
+TOOL_REGISTRY = ToolRegistry(TOOLS)
+
+
+class Progress:
+    """
+    notifications/progress de uma chamada de ferramenta. Com _meta.partialResults
+    o cliente recebe também cada página lida (partialResult) antes do resultado final.
+    """
+
+    def __init__(self, notify: Callable[[str, Dict[str, Any]], None], token: Any, partial: bool = False):
+        self.notify = notify
+        self.token = token
+        self.partial = partial
+
+    def update(self, progress: int, total: Optional[int] = None, message: Optional[str] = None,
+               content: Optional[List[Dict[str, Any]]] = None):
+        params = {"progressToken": self.token, "progress": progress}
+        if total is not None:
+            params["total"] = total
+        if message:
+            params["message"] = message
+        if content is not None and self.partial:
+            params["partialResult"] = {"content": content}
+        self.notify("notifications/progress", params)
+
+
+# Progresso da chamada de ferramenta em andamento (por thread / task), None sem progressToken
+current_progress: ContextVar[Optional[Progress]] = ContextVar("current_progress", default=None)
+
+
+class NocoDBMCPServer:
+    def __init__(self):
+        self.base_url = NOCODB_BASE_URL
+        self.api_key = NOCODB_API_KEY
+        self.headers = {
+            "xc-token": self.api_key,
+            "Content-Type": "application/json"
+        }
+        self.response_mode = NOCODB_MCP_RESPONSE_MODE
+        if self.response_mode not in RESPONSE_MODES:
+            logger.warning(f"NOCODB_MCP_RESPONSE_MODE inválido: {self.response_mode}, usando text")
+            self.response_mode = "text"
+        self.search_index = SearchIndex(NOCODB_SEARCH_TABLES) if NOCODB_SEARCH_TABLES else None
+        self._write_lock = threading.Lock()
+        self.resources = ResourceSnapshots(NOCODB_MCP_RESOURCE_TTL)
+        self.tool_handlers = self._tool_handlers()
+        
+        # Mapeamento de métodos
+        self.handlers = {
+            "initialize": self.handle_initialize,
+            "tools/list": self.handle_tools_list,
+            "tools/call": self.handle_tools_call,
+            "resources/list": self.handle_resources_list,
+            "resources/templates/list": self.handle_resources_templates_list,
+            "resources/read": self.handle_resources_read,
+            "resources/subscribe": self.handle_resources_subscribe,
+            "resources/unsubscribe": self.handle_resources_unsubscribe
+        }
+
+    def handle_initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {
+                "tools": {},
+                "resources": {
+                    "read": True,
+                    "write": False,
+                    "subscribe": True,
+                    "listChanged": True
                 }
-            ]
+            },
+            "serverInfo": {
+                "name": "nocodb-mcp-server",
+                "version": "3.0.0",
+                "description": "Servidor MCP completo para integração com todas as funções do NocoDB"
+            }
         }
 
+    def handle_tools_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return TOOL_REGISTRY.payload()
+
     def handle_tools_call(self, params: Dict[str, Any]) -> Dict[str, Any]:
         tool_name = params.get("name")
-        arguments = params.get("arguments", {})
+        arguments = dict(params.get("arguments", {}))
+        if_none_match = arguments.pop("if_none_match", None) or params.get("_meta", {}).get("ifNoneMatch")
+
+        handler = self.tool_handlers.get(tool_name)
+        if not handler:
+            return {"error": f"Ferramenta desconhecida: {tool_name}"}
+        try:
+            arguments = TOOL_REGISTRY.validate(tool_name, arguments)
+        except ToolArgumentError as e:
+            return {"error": f"Argumentos inválidos para {tool_name}: {e}"}
+        token = current_progress.set(self._progress(params))
+        try:
+            result = handler(**arguments)
+        finally:
+            current_progress.reset(token)
+        if "error" not in result:
+            self._schema_changed(tool_name, arguments)
+        return self._tool_result(tool_name, result, if_none_match)
+
+    def _progress(self, params: Dict[str, Any]) -> Optional[Progress]:
+        meta = params.get("_meta") or {}
+        if meta.get("progressToken") is None:
+            return None
+        return Progress(self._notify, meta["progressToken"], bool(meta.get("partialResults")))
 
-        tool_handlers = {
+    def _tool_handlers(self) -> Dict[str, Callable[..., Dict[str, Any]]]:
+        return {
             # Informações
             "get_info": self._get_info,
             
@@ -755,6 +947,7 @@ class NocoDBMCPServer:
             "bulk_create_records": self._bulk_create_records,
             "bulk_update_records": self._bulk_update_records,
             "bulk_delete_records": self._bulk_delete_records,
+            "aggregate_records": self._aggregate_records,
             
             # Views
             "list_views": self._list_views,
@@ -783,20 +976,123 @@ class NocoDBMCPServer:
             "upload_file": self._upload_file
         }
 
-        handler = tool_handlers.get(tool_name)
-        if handler:
-            return handler(**arguments)
-        else:
-            return {"error": f"Ferramenta desconhecida: {tool_name}"}
+    def _tool_result(self, tool_name: str, result: Dict[str, Any], if_none_match: Optional[str]) -> Dict[str, Any]:
+        if tool_name in READ_ONLY_TOOLS:
+            return self._with_etag(result, if_none_match)
+        return result
 
+    def _with_etag(self, result: Dict[str, Any], if_none_match: Optional[str]) -> Dict[str, Any]:
+        """Marca um resultado de leitura com o hash do conteúdo, ou responde de forma curta se o cliente já o tem"""
+        if "content" not in result:
+            return result
+        text = "".join(item.get("text", "") for item in result["content"])
+        etag = content_etag(text.encode())
+        if etag_matches(etag, if_none_match):
+            return {
+                "content": [{"type": "text", "text": f"Sem alterações desde {etag}"}],
+                "_meta": {"etag": etag, "notModified": True}
+            }
+        result["_meta"] = {"etag": etag}
+        return result
+
+    # Recursos: esquema das bases e tabelas, servido dos snapshots locais
     def handle_resources_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        return {"resources": []}
+        try:
+            bases = loads(self._resource(BASES_URI)).get("list", [])
+        except (ValueError, RuntimeError) as e:
+            return {"error": str(e)}
+        tables = {}
+        for base in bases:
+            try:
+                tables[base["id"]] = loads(self._resource(tables_uri(base["id"]))).get("list", [])
+            except (ValueError, RuntimeError) as e:
+                logger.error(f"Falha ao listar as tabelas da base {base['id']}: {e}")
+        return {"resources": self._resource_listing(bases, tables)}
+
+    def _resource_listing(self, bases: List[Dict[str, Any]], tables: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        resources = [{"uri": BASES_URI, "name": "Bases", "mimeType": "application/json"}]
+        for base in bases:
+            base_title = base.get("title", base["id"])
+            resources.append({
+                "uri": tables_uri(base["id"]),
+                "name": f"Tabelas de {base_title}",
+                "mimeType": "application/json"
+            })
+            for table in tables.get(base["id"], []):
+                resources.append({
+                    "uri": schema_uri(base["id"], table["id"]),
+                    "name": f"Esquema de {base_title}/{table.get('title', table['id'])}",
+                    "mimeType": "application/json"
+                })
+        return resources
+
+    def handle_resources_templates_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"resourceTemplates": RESOURCE_TEMPLATES}
 
     def handle_resources_read(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        return {"error": "Recursos não implementados"}
+        uri = params.get("uri")
+        try:
+            text = self._resource(uri)
+        except (ValueError, RuntimeError) as e:
+            return {"error": str(e)}
+        return {"contents": [{"uri": uri, "mimeType": "application/json", "text": text}]}
+
+    def handle_resources_subscribe(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        uri = params.get("uri")
+        try:
+            # Snapshot de referência para detectar as próximas mudanças
+            self._resource(uri)
+        except (ValueError, RuntimeError) as e:
+            return {"error": str(e)}
+        self.resources.subscribe(uri)
+        return {}
+
+    def handle_resources_unsubscribe(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.resources.unsubscribe(params.get("uri"))
+        return {}
+
+    def _resource(self, uri: str) -> str:
+        text = self.resources.get(uri)
+        if text is None:
+            text = self._fetch_resource(uri)
+            self._store_resource(uri, text)
+        return text
+
+    def _fetch_resource(self, uri: str) -> str:
+        return self._resource_text(self._make_request("GET", resource_endpoint(uri)))
+
+    def _resource_text(self, result: Dict[str, Any]) -> str:
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result["content"][0]["text"]
+
+    def _store_resource(self, uri: str, text: str):
+        if self.resources.put(uri, text) and self.resources.is_subscribed(uri):
+            self._notify("notifications/resources/updated", {"uri": uri})
+
+    def _schema_changed(self, tool_name: str, arguments: Dict[str, Any]):
+        """Descarta os snapshots afetados por uma ferramenta e avisa os assinantes"""
+        predicate = stale_resources(tool_name, arguments)
+        if predicate is None:
+            return
+        for uri in self.resources.invalidate(predicate):
+            self._notify("notifications/resources/updated", {"uri": uri})
+        if tool_name in LIST_CHANGING_TOOLS:
+            self._notify("notifications/resources/list_changed", {})
+
+    def _poll_resources(self, interval: float):
+        """Relê os recursos assinados, para avisar também sobre mudanças feitas fora deste servidor"""
+        while True:
+            time.sleep(interval)
+            for uri in self.resources.subscribed():
+                try:
+                    self._store_resource(uri, self._fetch_resource(uri))
+                except (ValueError, RuntimeError) as e:
+                    logger.error(f"Falha ao reler o recurso {uri}: {e}")
 
     # Métodos de API do NocoDB
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None,
+                      transform: Optional[Callable[[Any], Any]] = None) -> Dict[str, Any]:
         url = f"{self.base_url}{endpoint}"
         try:
             if method == "GET":
@@ -811,17 +1107,47 @@ class NocoDBMCPServer:
                 response = requests.delete(url, headers=self.headers)
             else:
                 return {"error": f"Método HTTP não suportado: {method}"}
-
-            if response.status_code in [200, 201, 204]:
-                if response.content:
-                    return {"content": [{"type": "text", "text": json.dumps(response.json())}]}
-                else:
-                    return {"content": [{"type": "text", "text": "Operação realizada com sucesso"}]}
-            else:
-                return {"error": f"Erro na requisição: {response.status_code} - {response.text}"}
+            return self._response_result(response, transform)
         except Exception as e:
             return {"error": str(e)}
 
+    def _response_result(self, response: Any, transform: Optional[Callable[[Any], Any]] = None) -> Dict[str, Any]:
+        """Converte a resposta HTTP (requests ou httpx) no resultado da ferramenta"""
+        if response.status_code in [200, 201, 204]:
+            if response.content:
+                if transform is None and self.response_mode != "text":
+                    # O corpo do NocoDB já é JSON: vai direto para o content, sem decodificar e recodificar
+                    result = {"content": [{"type": "text", "text": response.content.decode("utf-8")}]}
+                    if self.response_mode == "structured" and response.content.lstrip().startswith(b"{"):
+                        result["structuredContent"] = fragment(response.content)
+                    return result
+                body = loads(response.content)
+                if transform:
+                    body = transform(body)
+                return self._body_result(body)
+            else:
+                return {"content": [{"type": "text", "text": "Operação realizada com sucesso"}]}
+        else:
+            return {"error": f"Erro na requisição: {response.status_code} - {response.text}"}
+
+    def _body_result(self, body: Any) -> Dict[str, Any]:
+        result = {"content": [{"type": "text", "text": dumps(body)}]}
+        if self.response_mode == "structured" and isinstance(body, dict):
+            result["structuredContent"] = body
+        return result
+
+    def _run_chunks(self, steps: Generator[Dict[str, Any], Dict[str, Any], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Executa as requisições pedidas por um gerador (argumentos de _make_request),
+        devolvendo a ele cada resultado, e retorna o resultado final do gerador
+        """
+        result = None
+        try:
+            while True:
+                result = self._make_request(**steps.send(result))
+        except StopIteration as done:
+            return done.value
+
     # Implementação dos métodos
     def _get_info(self) -> Dict[str, Any]:
         return self._make_request("GET", "/meta/info")
@@ -887,7 +1213,22 @@ class NocoDBMCPServer:
         return self._make_request("DELETE", f"/meta/columns/{column_id}")
 
     # Registros
-    def _list_records(self, table_id: str, limit: int = 50, offset: int = 0, where: str = "", sort: str = None) -> Dict[str, Any]:
+    def _list_records(self, table_id: str, limit: int = 50, offset: int = 0, where: str = "", sort: str = None,
+                      pagination: str = "offset", cursor: str = None, format: str = "rows",
+                      exclude_system_fields: bool = False) -> Dict[str, Any]:
+        if format not in RECORD_FORMATS:
+            return {"error": f"Formato não suportado: {format}"}
+        try:
+            parse_where(where)
+        except WhereSyntaxError as e:
+            return {"error": str(e)}
+
+        def shape(body: Dict[str, Any]) -> Dict[str, Any]:
+            return format_records(body, format, exclude_system_fields)
+
+        if pagination == "cursor" or cursor:
+            return self._list_records_keyset(table_id, limit, where, sort, cursor, shape)
+
         params = {
             "limit": limit,
             "offset": offset
@@ -896,28 +1237,190 @@ class NocoDBMCPServer:
             params["where"] = where
         if sort:
             params["sort"] = sort
-        return self._make_request("GET", f"/tables/{table_id}/records", params=params)
+        progress = current_progress.get()
+        if progress and limit > NOCODB_MCP_CHUNK_SIZE:
+            return self._run_chunks(self._list_chunks(table_id, params, shape, progress))
+        # Sem reformatação a página do NocoDB segue sem ser decodificada (NOCODB_MCP_RESPONSE_MODE)
+        reshape = format != "rows" or exclude_system_fields
+        return self._make_request("GET", f"/tables/{table_id}/records", params=params,
+                                  transform=shape if reshape else None)
+
+    def _list_chunks(self, table_id: str, params: Dict[str, Any], shape: Callable[[Dict[str, Any]], Dict[str, Any]],
+                     progress: Progress):
+        """list_records em páginas de NOCODB_MCP_CHUNK_SIZE; cada página vai como resultado parcial"""
+        limit, offset = params["limit"], params["offset"]
+        rows = []
+        page_info = None
+        while len(rows) < limit:
+            size = min(NOCODB_MCP_CHUNK_SIZE, limit - len(rows))
+            pages = []
+
+            def keep(body: Dict[str, Any]) -> Dict[str, Any]:
+                pages.append(body)
+                return shape(body)
+
+            result = yield {"method": "GET", "endpoint": f"/tables/{table_id}/records",
+                            "params": {**params, "limit": size, "offset": offset + len(rows)}, "transform": keep}
+            if "error" in result:
+                return result
+            page = pages[0] if pages and isinstance(pages[0], dict) else {}
+            rows.extend(page.get("list", []))
+            page_info = page.get("pageInfo", page_info)
+            total = limit
+            if page_info and page_info.get("totalRows") is not None:
+                total = max(0, min(limit, page_info["totalRows"] - offset))
+            progress.update(len(rows), total, f"{len(rows)} registros lidos", result["content"])
+            # O NocoDB limita `limit` a DB_QUERY_LIMIT_MAX: uma página curta não indica o fim
+            if not page.get("list") or page.get("pageInfo", {}).get("isLastPage") or len(rows) >= total:
+                break
+
+        body = {"list": rows}
+        if page_info:
+            body["pageInfo"] = {**page_info, "page": offset // max(limit, 1) + 1, "pageSize": limit,
+                                "isFirstPage": offset == 0}
+        return self._body_result(shape(body))
+
+    def _list_records_keyset(self, table_id: str, limit: int, where: str, sort: str, cursor: str,
+                             shape: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+        try:
+            where, sort_params, state = keyset_query(where, sort, cursor)
+        except ValueError as e:
+            return {"error": str(e)}
+        params = {"limit": limit, "sort": ",".join(sort_params)}
+        if where:
+            params["where"] = where
+
+        def add_cursor(body: Dict[str, Any]) -> Dict[str, Any]:
+            body["next_cursor"] = next_cursor(body.get("list", []), state, body.get("pageInfo"))
+            return shape(body)
+
+        return self._make_request("GET", f"/tables/{table_id}/records", params=params, transform=add_cursor)
 
     def _get_record(self, table_id: str, record_id: str) -> Dict[str, Any]:
         return self._make_request("GET", f"/tables/{table_id}/records/{record_id}")
 
     def _create_record(self, table_id: str, data: Dict) -> Dict[str, Any]:
-        return self._make_request("POST", f"/tables/{table_id}/records", data)
+        def index(body: Any) -> Any:
+            if self.search_index and isinstance(body, dict) and body.get("Id") is not None:
+                self.search_index.add(table_id, [{**data, "Id": body["Id"]}])
+            return body
+
+        return self._make_request("POST", f"/tables/{table_id}/records", data, transform=index)
 
     def _update_record(self, table_id: str, record_id: str, data: Dict) -> Dict[str, Any]:
-        return self._make_request("PATCH", f"/tables/{table_id}/records/{record_id}", data)
+        result = self._make_request("PATCH", f"/tables/{table_id}/records/{record_id}", data)
+        if self.search_index and "error" not in result:
+            self.search_index.update(table_id, record_id, data)
+        return result
 
     def _delete_record(self, table_id: str, record_id: str) -> Dict[str, Any]:
-        return self._make_request("DELETE", f"/tables/{table_id}/records/{record_id}")
+        result = self._make_request("DELETE", f"/tables/{table_id}/records/{record_id}")
+        if self.search_index and "error" not in result:
+            self.search_index.remove(table_id, [record_id])
+        return result
+
+    def _bulk_indexer(self, table_id: str, method: str) -> Optional[Callable[[List[Any], Any], None]]:
+        """Aplica ao índice de pesquisa cada parte de uma operação em lote gravada no NocoDB"""
+        if not self.search_index:
+            return None
+
+        def written(items: List[Any], body: Any):
+            if method == "DELETE":
+                self.search_index.remove(table_id, items)
+            elif method == "PATCH":
+                for item in items:
+                    record_id = item.get("Id", item.get("id"))
+                    if record_id is not None:
+                        self.search_index.update(table_id, record_id, item)
+            else:
+                # O NocoDB devolve os Ids criados na ordem dos registros enviados
+                for item, row in zip(items, body if isinstance(body, list) else []):
+                    if isinstance(row, dict) and row.get("Id") is not None:
+                        self.search_index.add(table_id, [{**item, "Id": row["Id"]}])
+        return written
+
+    def _bulk_request(self, method: str, table_id: str, items: List[Any],
+                      payload: Callable[[List[Any]], Any] = list) -> Dict[str, Any]:
+        endpoint = f"/tables/{table_id}/records/bulk"
+        written = self._bulk_indexer(table_id, method)
+        progress = current_progress.get()
+        if progress and len(items) > NOCODB_MCP_CHUNK_SIZE:
+            return self._run_chunks(self._bulk_chunks(method, endpoint, items, payload, progress, written))
+        transform = (lambda body: written(items, body) or body) if written else None
+        return self._make_request(method, endpoint, payload(items), transform=transform)
+
+    def _bulk_chunks(self, method: str, endpoint: str, items: List[Any], payload: Callable[[List[Any]], Any],
+                     progress: Progress, written: Optional[Callable[[List[Any], Any], None]] = None):
+        """Operação em lote em partes de NOCODB_MCP_CHUNK_SIZE registros, uma após a outra"""
+        results = []
+        for start in range(0, len(items), NOCODB_MCP_CHUNK_SIZE):
+            chunk = items[start:start + NOCODB_MCP_CHUNK_SIZE]
+            bodies = []
+            result = yield {"method": method, "endpoint": endpoint, "data": payload(chunk),
+                            "transform": lambda body: bodies.append(body) or body}
+            if "error" in result:
+                # As partes anteriores já foram gravadas no NocoDB
+                return {"error": f"{result['error']} ({start} de {len(items)} registros processados antes da falha)"}
+            for body in bodies:
+                if written:
+                    written(chunk, body)
+                results.extend(body if isinstance(body, list) else [body])
+            done = start + len(chunk)
+            progress.update(done, len(items), f"{done} de {len(items)} registros")
+        return self._body_result(results)
 
     def _bulk_create_records(self, table_id: str, records: List[Dict]) -> Dict[str, Any]:
-        return self._make_request("POST", f"/tables/{table_id}/records/bulk", records)
+        return self._bulk_request("POST", table_id, records)
 
     def _bulk_update_records(self, table_id: str, records: List[Dict]) -> Dict[str, Any]:
-        return self._make_request("PATCH", f"/tables/{table_id}/records/bulk", records)
+        return self._bulk_request("PATCH", table_id, records)
 
     def _bulk_delete_records(self, table_id: str, record_ids: List[str]) -> Dict[str, Any]:
-        return self._make_request("DELETE", f"/tables/{table_id}/records/bulk", {"ids": record_ids})
+        return self._bulk_request("DELETE", table_id, record_ids, lambda ids: {"ids": ids})
+
+    def _aggregate_records(self, table_id: str, aggregates: List[str], group_by: List[str] = None,
+                           where: str = "") -> Dict[str, Any]:
+        try:
+            aggregator = Aggregator(group_by or [], aggregates)
+            parse_where(where)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        progress = current_progress.get()
+        try:
+            for rows in self._iter_pages(table_id, aggregator.fields() or ["Id"], where):
+                aggregator.add(rows)
+                if progress:
+                    progress.update(aggregator.rows_scanned, message=f"{aggregator.rows_scanned} registros agregados")
+        except Exception as e:
+            return {"error": str(e)}
+        return {"content": [{"type": "text", "text": dumps(aggregator.result())}]}
+
+    def _page_params(self, fields: Optional[List[str]], where: str, cursor: Optional[str]) -> tuple:
+        """Parâmetros de uma página de _iter_pages e o estado do cursor"""
+        page_where, sort_params, state = keyset_query(where, None, cursor)
+        params = {"limit": AGGREGATE_PAGE_SIZE, "sort": ",".join(sort_params)}
+        if fields:
+            params["fields"] = ",".join(cursor_fields(fields, state))
+        if page_where:
+            params["where"] = page_where
+        return params, state
+
+    def _iter_pages(self, table_id: str, fields: Optional[List[str]] = None, where: str = ""):
+        """Percorre a tabela inteira por cursor (Id), uma página por vez"""
+        cursor = None
+        while True:
+            params, state = self._page_params(fields, where, cursor)
+            response = requests.get(f"{self.base_url}/tables/{table_id}/records",
+                                    headers=self.headers, params=params)
+            if response.status_code != 200:
+                raise RuntimeError(f"Erro na requisição: {response.status_code} - {response.text}")
+            page = loads(response.content)
+            rows = page.get("list", [])
+            yield rows
+            cursor = next_cursor(rows, state, page.get("pageInfo"))
+            if not cursor:
+                break
 
     # Views
     def _list_views(self, table_id: str) -> Dict[str, Any]:
@@ -979,7 +1482,32 @@ class NocoDBMCPServer:
         return self._make_request("POST", f"/meta/views/{view_id}/share", data)
 
     # Pesquisa Global
-    def _global_search(self, base_id: str, query: str) -> Dict[str, Any]:
+    def _build_search_index(self):
+        """Indexa as tabelas de NOCODB_SEARCH_TABLES, uma página por vez (em segundo plano)"""
+        for table_id in sorted(self.search_index.tables - self.search_index.loaded):
+            try:
+                for rows in self._iter_pages(table_id):
+                    self.search_index.add(table_id, rows)
+                self.search_index.loaded.add(table_id)
+                logger.info(f"Índice de pesquisa da tabela {table_id} carregado")
+            except Exception as e:
+                logger.error(f"Falha ao indexar a tabela {table_id} para pesquisa: {e}")
+
+    def _base_tables(self, base_id: str) -> set:
+        """Ids das tabelas de uma base, lidos do snapshot do recurso da base"""
+        return {table["id"] for table in loads(self._resource(tables_uri(base_id))).get("list", [])}
+
+    def _global_search(self, base_id: str, query: str, limit: int = 25, remote: bool = False) -> Dict[str, Any]:
+        if self.search_index and not remote:
+            try:
+                tables = self._base_tables(base_id)
+            except (ValueError, RuntimeError) as e:
+                logger.error(f"Falha ao listar as tabelas da base {base_id}, usando o NocoDB: {e}")
+            else:
+                # O índice só responde quando todas as tabelas da base já foram indexadas
+                if tables and tables <= self.search_index.loaded:
+                    hits = self.search_index.search(query, limit, sorted(tables))
+                    return {"content": [{"type": "text", "text": dumps({"list": hits, "source": "index"})}]}
         params = {"query": query}
         return self._make_request("GET", f"/meta/bases/{base_id}/search", params=params)
 
@@ -1018,26 +1546,58 @@ class NocoDBMCPServer:
                 }
             }
 
-    def run(self):
-        logger.info("Servidor MCP NocoDB completo iniciado")
-        for line in sys.stdin:
-            try:
-                message = json.loads(line.strip())
-                response = self.process_message(message)
-                print(json.dumps(response))
-                sys.stdout.flush()
-            except json.JSONDecodeError as e:
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "error": {
-                        "code": -32700,
-                        "message": f"Erro de parse: {str(e)}"
-                    }
+    def _write(self, message: Dict[str, Any]):
+        line = dumps(message)
+        with self._write_lock:
+            print(line)
+            sys.stdout.flush()
+
+    def _notify(self, method: str, params: Dict[str, Any]):
+        self._write({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def _dispatch(self, message: Any, slots: threading.Semaphore):
+        try:
+            self._write(self.process_message(message))
+        except Exception as e:
+            logger.error(f"Erro inesperado: {str(e)}")
+            self._write({
+                "jsonrpc": "2.0",
+                "id": message.get("id") if isinstance(message, dict) else None,
+                "error": {
+                    "code": -32603,
+                    "message": f"Erro interno: {str(e)}"
                 }
-                print(json.dumps(error_response))
-                sys.stdout.flush()
-            except Exception as e:
-                logger.error(f"Erro inesperado: {str(e)}")
+            })
+        finally:
+            slots.release()
+
+    def run(self, concurrency: Optional[int] = None):
+        # Cada requisição roda em um worker; as respostas saem na ordem em que terminam,
+        # identificadas pelo id do JSON-RPC
+        concurrency = max(1, concurrency or NOCODB_MCP_CONCURRENCY)
+        slots = threading.Semaphore(concurrency)
+        logger.info(f"Servidor MCP NocoDB completo iniciado ({concurrency} requisições simultâneas)")
+        if NOCODB_MCP_RESOURCE_POLL_INTERVAL > 0:
+            threading.Thread(target=self._poll_resources, args=(NOCODB_MCP_RESOURCE_POLL_INTERVAL,),
+                             name="mcp-resources", daemon=True).start()
+        if self.search_index:
+            threading.Thread(target=self._build_search_index, name="mcp-search-index", daemon=True).start()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="mcp") as pool:
+            for line in sys.stdin:
+                try:
+                    message = loads(line.strip())
+                except JSONDecodeError as e:
+                    self._write({
+                        "jsonrpc": "2.0",
+                        "error": {
+                            "code": -32700,
+                            "message": f"Erro de parse: {str(e)}"
+                        }
+                    })
+                    continue
+                # Com todos os workers ocupados, espera um terminar antes de ler a próxima linha
+                slots.acquire()
+                pool.submit(self._dispatch, message, slots)
 
 if __name__ == "__main__":
     server = NocoDBMCPServer()
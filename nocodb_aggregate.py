@@ -0,0 +1,130 @@
+"""
+Group-by aggregation over NocoDB records
+
+Aggregates are written as "op(Field)", e.g. "sum(Amount)", "avg(Price)" or
+"count(*)". Pages are folded into running per-group accumulators as they
+arrive, so only one page and the aggregate rows are held in memory at a time.
+"""
+
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+AGGREGATE_OPS = ("count", "sum", "avg", "min", "max")
+
+_EXPRESSION = re.compile(r"^\s*(\w+)\s*\(\s*([^()]*?)\s*\)\s*$")
+
+
+def parse_aggregate(expression: str) -> Tuple[str, Optional[str]]:
+    """Split "sum(Amount)" into ("sum", "Amount"); count(*) gives ("count", None)"""
+    match = _EXPRESSION.match(expression)
+    if not match:
+        raise ValueError(f"Invalid aggregate: {expression!r} (expected op(Field), e.g. sum(Amount))")
+    op, field = match.group(1).lower(), match.group(2)
+    if op not in AGGREGATE_OPS:
+        raise ValueError(f"Unsupported aggregate: {op} (expected one of {', '.join(AGGREGATE_OPS)})")
+    if field in ("", "*"):
+        if op != "count":
+            raise ValueError(f"{op}() needs a field")
+        field = None
+    return op, field
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _hashable(value: Any) -> Any:
+    # Multi-select and link columns come back as lists or objects
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    return value
+
+
+class Aggregator:
+    def __init__(self, group_by: List[str], aggregates: List[str]):
+        if not aggregates:
+            raise ValueError("At least one aggregate is required")
+        self.group_by = list(group_by)
+        self.aggregates = [(expression, *parse_aggregate(expression)) for expression in aggregates]
+        self.groups: Dict[Any, Dict[str, Any]] = {}
+        self.rows_scanned = 0
+
+    def fields(self) -> List[str]:
+        """Columns to fetch from NocoDB"""
+        fields = dict.fromkeys(self.group_by)
+        fields.update(dict.fromkeys(field for _, _, field in self.aggregates if field))
+        return list(fields)
+
+    def add(self, rows: List[Dict[str, Any]]):
+        """Fold one page of records into the running aggregates"""
+        self.rows_scanned += len(rows)
+        keys = [tuple(_hashable(row.get(name)) for name in self.group_by) for row in rows]
+
+        # Split the page by group first, then reduce each column slice in one pass
+        batches: Dict[Any, List[Dict[str, Any]]] = {}
+        for key, row in zip(keys, rows):
+            batch = batches.get(key)
+            if batch is None:
+                batch = batches[key] = []
+                if key not in self.groups:
+                    self.groups[key] = {
+                        "values": {name: row.get(name) for name in self.group_by},
+                        "state": [[0, 0] if op in ("count", "sum", "avg") else None
+                                  for _, op, _ in self.aggregates]
+                    }
+            batch.append(row)
+
+        for key, batch in batches.items():
+            state = self.groups[key]["state"]
+            for index, (_, op, field) in enumerate(self.aggregates):
+                if field is None:
+                    state[index][1] += len(batch)
+                    continue
+                values = [row.get(field) for row in batch]
+                if op == "count":
+                    state[index][1] += sum(value is not None for value in values)
+                    continue
+                numbers = [number for number in map(_number, values) if number is not None]
+                if not numbers:
+                    continue
+                if op in ("sum", "avg"):
+                    state[index][0] = math.fsum((state[index][0], math.fsum(numbers)))
+                    state[index][1] += len(numbers)
+                elif op == "min":
+                    state[index] = min(numbers) if state[index] is None else min(state[index], min(numbers))
+                else:
+                    state[index] = max(numbers) if state[index] is None else max(state[index], max(numbers))
+
+    def result(self) -> Dict[str, Any]:
+        rows = []
+        for group in self.groups.values():
+            row = dict(group["values"])
+            for (expression, op, _), state in zip(self.aggregates, group["state"]):
+                if op == "count":
+                    row[expression] = state[1]
+                elif op == "sum":
+                    row[expression] = _integral(state[0])
+                elif op == "avg":
+                    row[expression] = state[0] / state[1] if state[1] else None
+                else:
+                    row[expression] = state
+            rows.append(row)
+        if not rows and not self.group_by:
+            # An empty table still has one (global) aggregate row
+            rows.append({expression: 0 if op in ("count", "sum") else None
+                         for expression, op, _ in self.aggregates})
+        return {"list": rows, "groups": len(rows), "rows_scanned": self.rows_scanned}
+
+
+def _integral(value: float) -> Any:
+    return int(value) if float(value).is_integer() else value
@@ -0,0 +1,72 @@
+"""
+Micro-batching of individual calls into bulk requests
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Set, Tuple
+
+
+class MicroBatcher:
+    """
+    Collect items submitted under the same key for up to `window` seconds or
+    `max_size` items, then hand them to `flush` in one call.
+
+    `flush(key, items)` must return one result per item, in order. A result
+    that is an Exception instance is raised to that item's caller only.
+    """
+
+    def __init__(self, flush: Callable[[Hashable, List[Any]], Awaitable[List[Any]]],
+                 window: float = 0.005, max_size: int = 100):
+        self.flush = flush
+        self.window = window
+        self.max_size = max_size
+        self.pending: Dict[Hashable, List[Tuple[Any, asyncio.Future]]] = {}
+        self.timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        # The event loop only keeps weak references to tasks; flushes in progress are held here
+        self.running: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self.pending.setdefault(key, [])
+        batch.append((item, future))
+        if len(batch) >= self.max_size:
+            self._flush_key(key)
+        elif len(batch) == 1:
+            self.timers[key] = loop.call_later(self.window, self._flush_key, key)
+        return await future
+
+    def _flush_key(self, key: Hashable):
+        timer = self.timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        batch = self.pending.pop(key, None)
+        if batch:
+            task = asyncio.ensure_future(self._run(key, batch))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+    async def _run(self, key: Hashable, batch: List[Tuple[Any, asyncio.Future]]):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.flush(key, [item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "pending": sum(len(batch) for batch in self.pending.values())
+        }
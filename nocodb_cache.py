@@ -0,0 +1,130 @@
+"""
+In-process caches for NocoDB responses
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+def content_etag(body: bytes, weak: bool = False) -> str:
+    """
+    ETag for a serialized response body. HTTP responses use the weak form: the
+    compression middleware may re-encode the body, and a strong ETag must not
+    be shared by the identity and the compressed representations.
+    """
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    return "W/" + etag if weak else etag
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag.strip()[2:].strip('"') if etag.strip().startswith("W/") else etag.strip().strip('"')
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """True when an If-None-Match value lists `etag` (or is "*"), by weak comparison"""
+    if not if_none_match:
+        return False
+    candidates = {_opaque_tag(candidate) for candidate in if_none_match.split(",")}
+    return "*" in candidates or _opaque_tag(etag) in candidates
+
+
+class MetadataCache:
+    """
+    TTL cache for schema metadata (bases, tables, columns, views).
+
+    Entries are grouped by kind ("list_tables", "list_columns", ...) and keyed by
+    the id they were read for, so a mutation can drop exactly the entries it
+    affects, or a whole kind when the owning id is not known. Each kind also has
+    a generation, bumped by every invalidation: a load that was in flight when
+    its kind was invalidated may hold pre-mutation data and is not stored.
+    """
+
+    def __init__(self, ttl: float = 300, ttls: Optional[Dict[str, float]] = None):
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.entries: Dict[str, Dict[Hashable, Tuple[float, Any]]] = {}
+        self.generations: Dict[str, int] = {}
+        self.epoch = 0  # bumped by clear()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _ttl(self, kind: str) -> float:
+        return self.ttls.get(kind, self.ttl)
+
+    async def get_or_load(self, kind: str, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        ttl = self._ttl(kind)
+        if ttl <= 0:
+            return await loader()
+
+        entry = self.entries.get(kind, {}).get(key)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        generation = (self.epoch, self.generations.get(kind, 0))
+        value = await loader()
+        if (self.epoch, self.generations.get(kind, 0)) == generation:
+            self.entries.setdefault(kind, {})[key] = (time.monotonic() + ttl, value)
+        return value
+
+    def invalidate(self, kind: str, key: Optional[Hashable] = None):
+        """Drop one entry, or every entry of `kind` when no key is given"""
+        self.generations[kind] = self.generations.get(kind, 0) + 1
+        bucket = self.entries.get(kind)
+        if not bucket:
+            return
+        if key is None:
+            self.invalidations += len(bucket)
+            bucket.clear()
+        elif bucket.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self.epoch += 1
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "entries": sum(len(bucket) for bucket in self.entries.values())
+        }
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls: the first caller for a key runs the
+    call, callers arriving while it is in flight await the same result.
+    Nothing is kept once the call completes, so results are never stale.
+    """
+
+    def __init__(self):
+        self.in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        task = self.in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(call())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Shield so one caller disconnecting does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self.in_flight)
+        }
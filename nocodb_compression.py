@@ -0,0 +1,183 @@
+"""
+Content-Encoding negotiation for the FastAPI apps
+
+ASGI middleware that compresses responses with zstd, brotli or gzip, whichever
+the client accepts with the highest q-value (server preference breaks ties).
+Responses smaller than `minimum_size` are sent as they are. Streaming responses
+(export, upload progress) are compressed chunk by chunk and flushed after every
+chunk, so clients still receive data as it is produced.
+
+brotli and zstd are used only when the `brotli` / `zstandard` packages are installed.
+"""
+
+import os
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+NOCODB_COMPRESSION = os.getenv("NOCODB_COMPRESSION", "zstd,br,gzip")
+NOCODB_COMPRESSION_MIN_SIZE = int(os.getenv("NOCODB_COMPRESSION_MIN_SIZE", "1024"))
+
+
+class _GzipCompressor:
+    def __init__(self):
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=4)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+COMPRESSORS = {"gzip": _GzipCompressor}
+if brotli is not None:
+    COMPRESSORS["br"] = _BrotliCompressor
+if zstandard is not None:
+    COMPRESSORS["zstd"] = _ZstdCompressor
+
+
+def available_encodings(preference: str = NOCODB_COMPRESSION) -> List[str]:
+    """Configured encodings, in server preference order, that can actually be produced"""
+    return [name.strip() for name in preference.split(",") if name.strip() in COMPRESSORS]
+
+
+def negotiate(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """Pick an encoding from an Accept-Encoding header, or None for identity"""
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for name in encodings:
+        quality = accepted.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = NOCODB_COMPRESSION_MIN_SIZE,
+                 encodings: Optional[List[str]] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings() if encodings is None else encodings
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        accept = b""
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                accept = value
+                break
+        encoding = negotiate(accept.decode("latin-1"), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+
+    @staticmethod
+    def _headers(message) -> List[Tuple[bytes, bytes]]:
+        return [(key.lower(), value) for key, value in message.get("headers", [])]
+
+    async def send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            headers = self._headers(self.start_message)
+            already_encoded = any(key == b"content-encoding" for key, _ in headers)
+            if already_encoded or (not more_body and len(body) < self.minimum_size):
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.compressor = COMPRESSORS[self.encoding]()
+            headers = [(key, value) for key, value in headers if key != b"content-length"]
+            headers.append((b"content-encoding", self.encoding.encode()))
+            headers.append((b"vary", b"Accept-Encoding"))
+            if not more_body:
+                data = self.compressor.compress(body) + self.compressor.finish()
+                headers.append((b"content-length", str(len(data)).encode()))
+                await self._send({**self.start_message, "headers": headers})
+                await self._send({"type": "http.response.body", "body": data})
+                return
+            await self._send({**self.start_message, "headers": headers})
+
+        data = self.compressor.compress(body)
+        data += self.compressor.flush() if more_body else self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -0,0 +1,55 @@
+"""
+Response shaping for NocoDB record listings
+"""
+
+from typing import Any, Dict, List
+
+RECORD_FORMATS = ("rows", "columnar")
+
+# Columns NocoDB adds to every table; Id is kept so records stay addressable
+SYSTEM_FIELDS = {"CreatedAt", "UpdatedAt", "nc_created_by", "nc_updated_by", "nc_order"}
+
+
+def is_system_field(name: str) -> bool:
+    return name in SYSTEM_FIELDS or name.startswith("nc_") or name.startswith("__nc")
+
+
+def strip_system_fields(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{key: value for key, value in row.items() if not is_system_field(key)} for row in rows]
+
+
+def to_columnar(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One list of column names plus one array of values per column"""
+    columns: Dict[str, None] = {}
+    for row in rows:
+        for key in row:
+            columns.setdefault(key, None)
+    names = list(columns)
+    return {
+        "columns": names,
+        "data": [[row.get(name) for row in rows] for name in names]
+    }
+
+
+def format_records(page: Dict[str, Any], format: str = "rows",
+                   exclude_system_fields: bool = False) -> Dict[str, Any]:
+    """
+    Reshape a list_records page. Keys other than "list" (pageInfo, next_cursor)
+    are kept as they are. Raises ValueError for an unknown format.
+    """
+    if format not in RECORD_FORMATS:
+        raise ValueError(f"Unsupported records format: {format} (expected one of {', '.join(RECORD_FORMATS)})")
+    if not isinstance(page, dict) or "list" not in page:
+        return page
+    if format == "rows" and not exclude_system_fields:
+        return page
+
+    rows = page["list"]
+    if exclude_system_fields:
+        rows = strip_system_fields(rows)
+    shaped = {key: value for key, value in page.items() if key != "list"}
+    if format == "columnar":
+        shaped.update(to_columnar(rows))
+    else:
+        shaped["list"] = rows
+    return shaped
@@ -4,13 +4,33 @@ NocoDB HTTP Server - REST API version for Railway deployment
 """
 
 import os
+import io
+import csv
+import asyncio
 import logging
-import requests
-from typing import Any, Dict, List, Optional
-from fastapi import FastAPI, HTTPException, Request
+import mimetypes
+import httpx
+from collections import deque
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 
+from nocodb_aggregate import Aggregator
+from nocodb_batching import MicroBatcher
+from nocodb_cache import MetadataCache, SingleFlight, content_etag, etag_matches
+from nocodb_compression import CompressionMiddleware
+from nocodb_json import FastJSONResponse, dumpb, dumps
+from nocodb_format import RECORD_FORMATS, format_records
+from nocodb_pagination import cursor_fields, keyset_query, next_cursor
+from nocodb_replica import Replica
+from nocodb_search import SearchIndex
+from nocodb_tools import ToolArgumentError, ToolRegistry
+from nocodb_where import UnsupportedFilterError, WhereSyntaxError, canonical_where, compile_where, parse_where
+import nocodb_pipeline as pipeline
+
 # Configuração do logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,13 +39,194 @@ logger = logging.getLogger(__name__)
 NOCODB_BASE_URL = os.getenv("NOCODB_BASE_URL", "https://nocodb.plataforma.app/api/v2")
 NOCODB_API_KEY = os.getenv("NOCODB_API_KEY", "")
 
-app = FastAPI(title="NocoDB HTTP Server", version="1.0.0")
+# Connection pool configuration
+NOCODB_POOL_MAX_CONNECTIONS = int(os.getenv("NOCODB_POOL_MAX_CONNECTIONS", "100"))
+NOCODB_POOL_MAX_KEEPALIVE = int(os.getenv("NOCODB_POOL_MAX_KEEPALIVE", "20"))
+NOCODB_POOL_KEEPALIVE_EXPIRY = float(os.getenv("NOCODB_POOL_KEEPALIVE_EXPIRY", "30"))
+NOCODB_HTTP2 = os.getenv("NOCODB_HTTP2", "false").lower() in ("1", "true", "yes")
+NOCODB_TIMEOUT = float(os.getenv("NOCODB_TIMEOUT", "30"))
+
+# Metadata cache configuration (seconds, 0 disables)
+NOCODB_META_CACHE_TTL = float(os.getenv("NOCODB_META_CACHE_TTL", "300"))
+
+# Bulk write configuration
+NOCODB_BULK_CHUNK_SIZE = int(os.getenv("NOCODB_BULK_CHUNK_SIZE", "100"))
+NOCODB_BULK_CONCURRENCY = int(os.getenv("NOCODB_BULK_CONCURRENCY", "4"))
+NOCODB_BULK_RETRIES = int(os.getenv("NOCODB_BULK_RETRIES", "2"))
+
+# create_record micro-batching (opt-in)
+NOCODB_CREATE_BATCHING = os.getenv("NOCODB_CREATE_BATCHING", "false").lower() in ("1", "true", "yes")
+NOCODB_CREATE_BATCH_WINDOW_MS = float(os.getenv("NOCODB_CREATE_BATCH_WINDOW_MS", "5"))
+NOCODB_CREATE_BATCH_MAX = int(os.getenv("NOCODB_CREATE_BATCH_MAX", "100"))
+
+# Upload configuration
+NOCODB_UPLOAD_CONCURRENCY = int(os.getenv("NOCODB_UPLOAD_CONCURRENCY", "4"))
+UPLOAD_PROGRESS_STEP = 1024 * 1024
+
+# Export configuration
+NOCODB_EXPORT_PAGE_SIZE = int(os.getenv("NOCODB_EXPORT_PAGE_SIZE", "1000"))
+NOCODB_SCAN_CONCURRENCY = int(os.getenv("NOCODB_SCAN_CONCURRENCY", "8"))
+NOCODB_SCAN_MAX_ROWS = int(os.getenv("NOCODB_SCAN_MAX_ROWS", "50000"))
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# Local SQLite read replica (comma-separated table ids, empty disables)
+NOCODB_REPLICA_TABLES = [t.strip() for t in os.getenv("NOCODB_REPLICA_TABLES", "").split(",") if t.strip()]
+NOCODB_REPLICA_PATH = os.getenv("NOCODB_REPLICA_PATH", "nocodb_replica.sqlite3")
+NOCODB_REPLICA_SYNC_INTERVAL = float(os.getenv("NOCODB_REPLICA_SYNC_INTERVAL", "30"))
+NOCODB_REPLICA_FULL_SYNC_INTERVAL = float(os.getenv("NOCODB_REPLICA_FULL_SYNC_INTERVAL", "3600"))
+
+# Local full-text index for global_search (comma-separated table ids, empty disables)
+NOCODB_SEARCH_TABLES = [t.strip() for t in os.getenv("NOCODB_SEARCH_TABLES", "").split(",") if t.strip()]
+
+app = FastAPI(title="NocoDB HTTP Server", version="1.0.0", default_response_class=FastJSONResponse)
+app.add_middleware(CompressionMiddleware)
+
+# Tools without side effects; identical concurrent calls to these share one upstream request
+READ_ONLY_TOOLS = {
+    "list_bases", "get_base", "list_tables", "get_table", "list_columns",
+    "list_records", "get_record", "list_views", "list_filters", "list_sorts",
+    "list_webhooks", "global_search", "list_comments", "aggregate_records"
+}
+
+# Tools exposed by /tools and /execute: NocoDBAPI methods, argument schemas taken from their signatures
+TOOL_DESCRIPTIONS = {
+    # Bases
+    "list_bases": "List all bases",
+    "get_base": "Get specific base",
+    "create_base": "Create new base",
+    "update_base": "Update existing base",
+    "delete_base": "Delete base",
+    
+    # Tables
+    "list_tables": "List all tables in a base",
+    "get_table": "Get specific table",
+    "create_table": "Create new table",
+    "update_table": "Update existing table",
+    "delete_table": "Delete table",
+    
+    # Columns
+    "list_columns": "List all columns in a table",
+    "create_column": "Create new column",
+    "update_column": "Update existing column",
+    "delete_column": "Delete column",
+    
+    # Records
+    "list_records": "List all records in a table",
+    "get_record": "Get specific record",
+    "create_record": "Create new record",
+    "update_record": "Update existing record",
+    "delete_record": "Delete record",
+    
+    # Bulk operations
+    "bulk_create_records": "Create multiple records",
+    "bulk_update_records": "Update multiple records",
+    "bulk_delete_records": "Delete multiple records",
+    
+    # Export
+    "export_records": "Stream all records of a table as NDJSON or CSV",
+    
+    # Aggregation
+    "aggregate_records": "Group records and compute count/sum/avg/min/max",
+    
+    # Views
+    "list_views": "List all views in a table",
+    "create_view": "Create new view",
+    "update_view": "Update existing view",
+    "delete_view": "Delete view",
+    
+    # Filters
+    "list_filters": "List all filters in a view",
+    "create_filter": "Create new filter",
+    "update_filter": "Update existing filter",
+    "delete_filter": "Delete filter",
+    
+    # Sort
+    "list_sorts": "List all sorts in a view",
+    "create_sort": "Create new sort",
+    "update_sort": "Update existing sort",
+    "delete_sort": "Delete sort",
+    
+    # Shared views
+    "create_shared_view": "Create shared view",
+    "update_shared_view": "Update shared view",
+    "delete_shared_view": "Delete shared view",
+    
+    # Webhooks
+    "list_webhooks": "List all webhooks",
+    "create_webhook": "Create new webhook",
+    "update_webhook": "Update existing webhook",
+    "delete_webhook": "Delete webhook",
+    
+    # Other
+    "global_search": "Search across all data",
+    "list_comments": "List all comments for a record",
+    "create_comment": "Create new comment",
+    "update_comment": "Update existing comment",
+    "delete_comment": "Delete comment",
+    "upload_file": "Upload file to storage",
+    "upload_files": "Upload many files concurrently and return attachment descriptors"
+}
 
 # Pydantic models
 class ExecuteRequest(BaseModel):
     tool: str
     args: Dict[str, Any]
 
+class PipelineStep(BaseModel):
+    id: str
+    tool: str
+    args: Dict[str, Any] = {}
+    depends_on: List[str] = []
+
+class PipelineRequest(BaseModel):
+    steps: List[PipelineStep]
+
+class UploadRequest(BaseModel):
+    storage: str = "local"
+    file_paths: List[str]
+    concurrency: Optional[int] = None
+
+def _http2_available() -> bool:
+    if not NOCODB_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("NOCODB_HTTP2 is set but the 'h2' package is not installed, falling back to HTTP/1.1")
+        return False
+
+class _ProgressFile:
+    """File wrapper that reports bytes as httpx reads them while streaming the upload"""
+    def __init__(self, file, on_read: Callable[[int], None]):
+        self._file = file
+        self._on_read = on_read
+    
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._file.read(size)
+        if chunk:
+            self._on_read(len(chunk))
+        return chunk
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._file, name)
+
+class RequestNotSent(HTTPException):
+    """The request never reached NocoDB (connection refused, pool or connect timeout), so it is safe to resend"""
+    def __init__(self, detail: str):
+        super().__init__(status_code=500, detail=detail)
+
+def check_where(where: Optional[str]) -> Optional[str]:
+    """Reject a malformed where filter with a 400 before it reaches NocoDB"""
+    try:
+        parse_where(where)
+    except WhereSyntaxError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return where
+
 class NocoDBAPI:
     def __init__(self):
         self.base_url = NOCODB_BASE_URL
@@ -33,103 +234,229 @@ class NocoDBAPI:
         # Try both header formats for compatibility
         self.headers = {
             "xc-token": self.api_key,
-            "xc-auth": self.api_key,
-            "Content-Type": "application/json"
+            "xc-auth": self.api_key
         }
+        self.http2 = _http2_available()
+        self.limits = httpx.Limits(
+            max_connections=NOCODB_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=NOCODB_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=NOCODB_POOL_KEEPALIVE_EXPIRY
+        )
+        # Single keep-alive transport shared by every request to NocoDB
+        self.transport = httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2)
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            transport=self.transport,
+            timeout=NOCODB_TIMEOUT
+        )
+        self.request_count = 0
+        self.error_count = 0
+        self.meta_cache = MetadataCache(ttl=NOCODB_META_CACHE_TTL)
+        self.create_batcher = None
+        if NOCODB_CREATE_BATCHING:
+            self.create_batcher = MicroBatcher(
+                self._flush_creates,
+                window=NOCODB_CREATE_BATCH_WINDOW_MS / 1000,
+                max_size=NOCODB_CREATE_BATCH_MAX
+            )
+        self.search_index = SearchIndex(NOCODB_SEARCH_TABLES) if NOCODB_SEARCH_TABLES else None
+        self.replica = None
+        if NOCODB_REPLICA_TABLES:
+            self.replica = Replica(
+                NOCODB_REPLICA_PATH, NOCODB_REPLICA_TABLES,
+                sync_interval=NOCODB_REPLICA_SYNC_INTERVAL,
+                full_sync_interval=NOCODB_REPLICA_FULL_SYNC_INTERVAL
+            )
     
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+    async def close(self):
+        if self.search_index:
+            self.search_index.stop()
+        if self.replica:
+            await self.replica.stop()
+        await self.client.aclose()
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool usage, reported on /health"""
+        pool = getattr(self.transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "requests": self.request_count,
+            "errors": self.error_count
+        }
+    
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        self.request_count += 1
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            response.raise_for_status()
+            return response
+        except httpx.HTTPError:
+            self.error_count += 1
+            raise
+    
+    async def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         url = f"{self.base_url}{endpoint}"
         logger.info(f"Making {method} request to {url}")
         
         try:
-            response = requests.request(
-                method=method,
-                url=url,
-                headers=self.headers,
-                **kwargs
-            )
-            response.raise_for_status()
+            response = await self._send(method, url, **kwargs)
             return response.json() if response.content else {}
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP error: {e}, Response: {e.response.text if e.response else 'No response'}")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error: {e}, Response: {e.response.text}")
             raise HTTPException(status_code=e.response.status_code, detail=str(e))
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+            logger.error(f"Request error: {e}")
+            raise RequestNotSent(detail=str(e))
         except Exception as e:
             logger.error(f"Request error: {e}")
             raise HTTPException(status_code=500, detail=str(e))
     
+    async def _make_meta_request(self, invalidate: List[tuple], method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """Send a schema mutation and drop the cached metadata it affects (key None = whole kind)"""
+        try:
+            return await self._make_request(method, endpoint, **kwargs)
+        finally:
+            for kind, key in invalidate:
+                self.meta_cache.invalidate(kind, key)
+    
     # Bases/Projects
-    def list_bases(self) -> List[Dict[str, Any]]:
+    async def list_bases(self) -> List[Dict[str, Any]]:
+        return await self.meta_cache.get_or_load("list_bases", None, self._fetch_bases)
+    
+    async def _fetch_bases(self) -> List[Dict[str, Any]]:
         # Try both v1 and v2 endpoints
         try:
-            return self._make_request("GET", "/bases")
+            return await self._make_request("GET", "/bases")
         except HTTPException:
             # Fallback to v1 projects endpoint
             base_url_v1 = self.base_url.replace("/api/v2", "/api/v1")
             url = f"{base_url_v1}/db/meta/projects"
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
+            response = await self._send("GET", url)
             return response.json()
     
-    def get_base(self, base_id: str) -> Dict[str, Any]:
-        return self._make_request("GET", f"/bases/{base_id}")
+    async def get_base(self, base_id: str) -> Dict[str, Any]:
+        return await self._make_request("GET", f"/bases/{base_id}")
     
-    def create_base(self, name: str, description: Optional[str] = None) -> Dict[str, Any]:
+    async def create_base(self, name: str, description: Optional[str] = None) -> Dict[str, Any]:
         data = {"name": name}
         if description:
             data["description"] = description
-        return self._make_request("POST", "/bases", json=data)
+        return await self._make_meta_request([("list_bases", None)], "POST", "/bases", json=data)
     
-    def update_base(self, base_id: str, name: Optional[str] = None, description: Optional[str] = None) -> Dict[str, Any]:
+    async def update_base(self, base_id: str, name: Optional[str] = None, description: Optional[str] = None) -> Dict[str, Any]:
         data = {}
         if name:
             data["name"] = name
         if description:
             data["description"] = description
-        return self._make_request("PATCH", f"/bases/{base_id}", json=data)
+        return await self._make_meta_request([("list_bases", None)], "PATCH", f"/bases/{base_id}", json=data)
     
-    def delete_base(self, base_id: str) -> Dict[str, Any]:
-        return self._make_request("DELETE", f"/bases/{base_id}")
+    async def delete_base(self, base_id: str) -> Dict[str, Any]:
+        return await self._make_meta_request(
+            [("list_bases", None), ("list_tables", base_id)],
+            "DELETE", f"/bases/{base_id}"
+        )
     
     # Tables
-    def list_tables(self, base_id: str) -> List[Dict[str, Any]]:
-        return self._make_request("GET", f"/bases/{base_id}/tables")
+    async def list_tables(self, base_id: str) -> List[Dict[str, Any]]:
+        return await self.meta_cache.get_or_load(
+            "list_tables", base_id,
+            lambda: self._make_request("GET", f"/bases/{base_id}/tables")
+        )
     
-    def get_table(self, base_id: str, table_id: str) -> Dict[str, Any]:
-        return self._make_request("GET", f"/tables/{table_id}")
+    async def get_table(self, base_id: str, table_id: str) -> Dict[str, Any]:
+        return await self.meta_cache.get_or_load(
+            "get_table", table_id,
+            lambda: self._make_request("GET", f"/tables/{table_id}")
+        )
     
-    def create_table(self, base_id: str, name: str, columns: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def create_table(self, base_id: str, name: str, columns: List[Dict[str, Any]]) -> Dict[str, Any]:
         data = {
             "name": name,
             "columns": columns
         }
-        return self._make_request("POST", f"/bases/{base_id}/tables", json=data)
+        return await self._make_meta_request([("list_tables", base_id)], "POST", f"/bases/{base_id}/tables", json=data)
     
-    def update_table(self, table_id: str, name: Optional[str] = None) -> Dict[str, Any]:
+    async def update_table(self, table_id: str, name: Optional[str] = None) -> Dict[str, Any]:
         data = {}
         if name:
             data["name"] = name
-        return self._make_request("PATCH", f"/tables/{table_id}", json=data)
+        return await self._make_meta_request(
+            [("list_tables", None), ("get_table", table_id)],
+            "PATCH", f"/tables/{table_id}", json=data
+        )
     
-    def delete_table(self, table_id: str) -> Dict[str, Any]:
-        return self._make_request("DELETE", f"/tables/{table_id}")
+    async def delete_table(self, table_id: str) -> Dict[str, Any]:
+        return await self._make_meta_request(
+            [("list_tables", None), ("get_table", table_id), ("list_columns", table_id), ("list_views", table_id)],
+            "DELETE", f"/tables/{table_id}"
+        )
     
     # Columns
-    def list_columns(self, table_id: str) -> List[Dict[str, Any]]:
-        return self._make_request("GET", f"/tables/{table_id}/columns")
+    async def list_columns(self, table_id: str) -> List[Dict[str, Any]]:
+        return await self.meta_cache.get_or_load(
+            "list_columns", table_id,
+            lambda: self._make_request("GET", f"/tables/{table_id}/columns")
+        )
     
-    def create_column(self, table_id: str, column_data: Dict[str, Any]) -> Dict[str, Any]:
-        return self._make_request("POST", f"/tables/{table_id}/columns", json=column_data)
+    async def create_column(self, table_id: str, column_data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._make_meta_request(
+            [("list_columns", table_id), ("get_table", table_id)],
+            "POST", f"/tables/{table_id}/columns", json=column_data
+        )
     
-    def update_column(self, column_id: str, column_data: Dict[str, Any]) -> Dict[str, Any]:
-        return self._make_request("PATCH", f"/columns/{column_id}", json=column_data)
+    async def update_column(self, column_id: str, column_data: Dict[str, Any]) -> Dict[str, Any]:
+        # The owning table is unknown here, so every column listing is dropped
+        return await self._make_meta_request(
+            [("list_columns", None), ("get_table", None)],
+            "PATCH", f"/columns/{column_id}", json=column_data
+        )
     
-    def delete_column(self, column_id: str) -> Dict[str, Any]:
-        return self._make_request("DELETE", f"/columns/{column_id}")
+    async def delete_column(self, column_id: str) -> Dict[str, Any]:
+        return await self._make_meta_request(
+            [("list_columns", None), ("get_table", None)],
+            "DELETE", f"/columns/{column_id}"
+        )
     
     # Records
-    def list_records(self, table_id: str, limit: int = 25, offset: int = 0, 
+    async def list_records(self, table_id: str, limit: int = 25, offset: int = 0, 
                     fields: Optional[List[str]] = None, where: Optional[str] = None,
-                    sort: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+                    sort: Optional[List[str]] = None, pagination: str = "offset",
+                    cursor: Optional[str] = None, format: str = "rows",
+                    exclude_system_fields: bool = False,
+                    max_staleness: Optional[float] = None) -> List[Dict[str, Any]]:
+        check_where(where)
+        if format != "rows" or exclude_system_fields:
+            if format not in RECORD_FORMATS:
+                raise HTTPException(status_code=400, detail=f"Unsupported records format: {format}")
+            page = await self.list_records(table_id, limit, offset, fields, where, sort, pagination, cursor,
+                                           max_staleness=max_staleness)
+            return format_records(page, format, exclude_system_fields)
+        
+        # Callers that accept stale data are answered from the local replica when it is fresh enough
+        if max_staleness is not None and self.replica and pagination == "offset" and not cursor:
+            try:
+                predicate = compile_where(where) if where else None
+            except UnsupportedFilterError:
+                pass
+            else:
+                page = self.replica.list_records(table_id, max_staleness, limit, offset, fields, sort, predicate)
+                if page is not None:
+                    return page
+        
+        if pagination == "cursor" or cursor:
+            return await self._list_records_keyset(table_id, limit, fields, where, sort, cursor)
+        if pagination == "scan":
+            return await self._list_records_scan(table_id, fields, where, sort)
+        
         params = {
             "limit": limit,
             "offset": offset
@@ -141,106 +468,374 @@ class NocoDBAPI:
         if sort:
             params["sort"] = sort
         
-        return self._make_request("GET", f"/tables/{table_id}/records", params=params)
+        return await self._make_request("GET", f"/tables/{table_id}/records", params=params)
     
-    def get_record(self, table_id: str, record_id: str) -> Dict[str, Any]:
-        return self._make_request("GET", f"/tables/{table_id}/records/{record_id}")
+    async def _list_records_keyset(self, table_id: str, limit: int, fields: Optional[List[str]],
+                                   where: Optional[str], sort: Optional[List[str]],
+                                   cursor: Optional[str]) -> Dict[str, Any]:
+        try:
+            where, sort, state = keyset_query(where, ",".join(sort or []), cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        page = await self.list_records(table_id, limit=limit, fields=cursor_fields(fields, state),
+                                       where=where, sort=sort)
+        try:
+            page["next_cursor"] = next_cursor(page.get("list", []), state, page.get("pageInfo"))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return page
+    
+    async def _list_records_scan(self, table_id: str, fields: Optional[List[str]],
+                                 where: Optional[str], sort: Optional[List[str]]) -> Dict[str, Any]:
+        # The whole result is held in memory (and hashed for the ETag); larger tables go through /export
+        records = []
+        pages = self.iter_records(table_id, fields=fields, where=where, sort=sort)
+        try:
+            async for rows in pages:
+                records.extend(rows)
+                if len(records) > NOCODB_SCAN_MAX_ROWS:
+                    raise HTTPException(status_code=400,
+                                        detail=f"pagination=scan returns at most {NOCODB_SCAN_MAX_ROWS} records; "
+                                               f"use /export/{table_id} to stream larger results")
+        finally:
+            await pages.aclose()
+        return {"list": records, "pageInfo": {"totalRows": len(records), "isLastPage": True}}
+    
+    async def get_record(self, table_id: str, record_id: str,
+                         max_staleness: Optional[float] = None) -> Dict[str, Any]:
+        if max_staleness is not None and self.replica:
+            record = self.replica.get_record(table_id, record_id, max_staleness)
+            if record is not None:
+                return record
+        return await self._make_request("GET", f"/tables/{table_id}/records/{record_id}")
+    
+    def _records_changed(self, table_id: str):
+        """Called before every record write that goes through this server"""
+        if self.replica:
+            self.replica.mark_dirty(table_id)
+    
+    def _index_written(self, table_id: str, records: List[Dict[str, Any]], results: List[Any],
+                       partial: bool = False):
+        """Keep the search index in step with records written through this server"""
+        if not self.search_index:
+            return
+        for record, result in zip(records, results):
+            record_id = result.get("Id") if isinstance(result, dict) else None
+            record_id = record_id if record_id is not None else record.get("Id", record.get("id"))
+            if record_id is None:
+                continue
+            if partial:
+                self.search_index.update(table_id, record_id, record)
+            else:
+                self.search_index.add(table_id, [{**record, "Id": record_id}])
+    
+    def _succeeded(self, report: Dict[str, Any], items: List[Any]) -> List[tuple]:
+        """(items, result) pairs of the chunks of a bulk report that went through"""
+        return [(items[chunk["offset"]:chunk["offset"] + chunk["size"]], chunk.get("result"))
+                for chunk in report["chunks"] if chunk["status"] == "ok"]
+    
+    async def create_record(self, table_id: str, record_data: Dict[str, Any]) -> Dict[str, Any]:
+        self._records_changed(table_id)
+        if self.create_batcher:
+            created = await self.create_batcher.submit(table_id, record_data)
+        else:
+            created = await self._make_request("POST", f"/tables/{table_id}/records", json=record_data)
+        self._index_written(table_id, [record_data], [created])
+        return created
     
-    def create_record(self, table_id: str, record_data: Dict[str, Any]) -> Dict[str, Any]:
-        return self._make_request("POST", f"/tables/{table_id}/records", json=record_data)
+    async def _flush_creates(self, table_id: str, rows: List[Dict[str, Any]]) -> List[Any]:
+        """Insert rows collected by the create_record batcher, one result per row"""
+        endpoint = f"/tables/{table_id}/records"
+        if len(rows) > 1:
+            try:
+                created = await self._make_request("POST", f"{endpoint}/bulk", json=rows)
+            except HTTPException as e:
+                # A 5xx or timeout may come after NocoDB wrote the rows, so only a rejection
+                # (4xx) or a request that never went out is safe to resend
+                if e.status_code >= 500 and not isinstance(e, RequestNotSent):
+                    return [e] * len(rows)
+                # One bad row rejects the whole bulk insert; retry rows individually
+                # so every caller gets its own outcome
+                logger.warning(f"Batched insert of {len(rows)} rows into {table_id} failed ({e.detail}), retrying one by one")
+            else:
+                if isinstance(created, list) and len(created) == len(rows):
+                    return created
+                error = HTTPException(status_code=502, detail="Unexpected bulk insert response from NocoDB")
+                return [error] * len(rows)
+        return await asyncio.gather(
+            *[self._make_request("POST", endpoint, json=row) for row in rows],
+            return_exceptions=True
+        )
     
-    def update_record(self, table_id: str, record_id: str, record_data: Dict[str, Any]) -> Dict[str, Any]:
-        return self._make_request("PATCH", f"/tables/{table_id}/records/{record_id}", json=record_data)
+    async def update_record(self, table_id: str, record_id: str, record_data: Dict[str, Any]) -> Dict[str, Any]:
+        self._records_changed(table_id)
+        updated = await self._make_request("PATCH", f"/tables/{table_id}/records/{record_id}", json=record_data)
+        self._index_written(table_id, [{**record_data, "Id": record_id}], [None], partial=True)
+        return updated
     
-    def delete_record(self, table_id: str, record_id: str) -> Dict[str, Any]:
-        return self._make_request("DELETE", f"/tables/{table_id}/records/{record_id}")
+    async def delete_record(self, table_id: str, record_id: str) -> Dict[str, Any]:
+        self._records_changed(table_id)
+        deleted = await self._make_request("DELETE", f"/tables/{table_id}/records/{record_id}")
+        if self.replica:
+            self.replica.remove(table_id, [record_id])
+        if self.search_index:
+            self.search_index.remove(table_id, [record_id])
+        return deleted
     
     # Bulk operations
-    def bulk_create_records(self, table_id: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
-        return self._make_request("POST", f"/tables/{table_id}/records/bulk", json=records)
+    async def _bulk_request(self, method: str, endpoint: str, items: List[Any],
+                            payload: Callable[[List[Any]], Any],
+                            chunk_size: Optional[int] = None, concurrency: Optional[int] = None,
+                            retries: Optional[int] = None, idempotent: bool = True) -> Dict[str, Any]:
+        """
+        Send `items` in chunks, a bounded number at a time, retrying chunks that fail
+        with a transient error (429, 5xx or network). Non-idempotent chunks are only
+        retried when NocoDB cannot have applied them (429, connection never made), so
+        a timeout after a commit does not write the rows twice. Returns a per-chunk report.
+        """
+        chunk_size = max(1, chunk_size or NOCODB_BULK_CHUNK_SIZE)
+        retries = NOCODB_BULK_RETRIES if retries is None else retries
+        semaphore = asyncio.Semaphore(max(1, concurrency or NOCODB_BULK_CONCURRENCY))
+        
+        async def send_chunk(index: int, start: int) -> Dict[str, Any]:
+            chunk = items[start:start + chunk_size]
+            report = {"chunk": index, "offset": start, "size": len(chunk), "attempts": 0}
+            async with semaphore:
+                while True:
+                    report["attempts"] += 1
+                    try:
+                        report["result"] = await self._make_request(method, endpoint, json=payload(chunk))
+                        report["status"] = "ok"
+                        return report
+                    except HTTPException as e:
+                        if idempotent:
+                            transient = e.status_code == 429 or e.status_code >= 500
+                        else:
+                            transient = e.status_code == 429 or isinstance(e, RequestNotSent)
+                        if not transient or report["attempts"] > retries:
+                            report["status"] = "error"
+                            report["error"] = e.detail
+                            return report
+                    await asyncio.sleep(0.5 * 2 ** (report["attempts"] - 1))
+        
+        chunks = await asyncio.gather(*[
+            send_chunk(index, start) for index, start in enumerate(range(0, len(items), chunk_size))
+        ])
+        records = []
+        for chunk in chunks:
+            result = chunk.get("result")
+            records.extend(result if isinstance(result, list) else [result] if result else [])
+        succeeded = sum(chunk["size"] for chunk in chunks if chunk["status"] == "ok")
+        return {
+            "records": records,
+            "total": len(items),
+            "succeeded": succeeded,
+            "failed": len(items) - succeeded,
+            "chunks": chunks
+        }
+    
+    async def bulk_create_records(self, table_id: str, records: List[Dict[str, Any]],
+                                  chunk_size: Optional[int] = None, concurrency: Optional[int] = None,
+                                  retries: Optional[int] = None) -> Dict[str, Any]:
+        self._records_changed(table_id)
+        report = await self._bulk_request("POST", f"/tables/{table_id}/records/bulk", records,
+                                          lambda chunk: chunk, chunk_size, concurrency, retries, idempotent=False)
+        for chunk, created in self._succeeded(report, records):
+            self._index_written(table_id, chunk, created if isinstance(created, list) else [])
+        return report
     
-    def bulk_update_records(self, table_id: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
-        return self._make_request("PATCH", f"/tables/{table_id}/records/bulk", json=records)
+    async def bulk_update_records(self, table_id: str, records: List[Dict[str, Any]],
+                                  chunk_size: Optional[int] = None, concurrency: Optional[int] = None,
+                                  retries: Optional[int] = None) -> Dict[str, Any]:
+        self._records_changed(table_id)
+        report = await self._bulk_request("PATCH", f"/tables/{table_id}/records/bulk", records,
+                                          lambda chunk: chunk, chunk_size, concurrency, retries)
+        for chunk, _ in self._succeeded(report, records):
+            self._index_written(table_id, chunk, [None] * len(chunk), partial=True)
+        return report
     
-    def bulk_delete_records(self, table_id: str, record_ids: List[str]) -> Dict[str, Any]:
-        return self._make_request("DELETE", f"/tables/{table_id}/records/bulk", json={"ids": record_ids})
+    async def bulk_delete_records(self, table_id: str, record_ids: List[str],
+                                  chunk_size: Optional[int] = None, concurrency: Optional[int] = None,
+                                  retries: Optional[int] = None) -> Dict[str, Any]:
+        self._records_changed(table_id)
+        report = await self._bulk_request("DELETE", f"/tables/{table_id}/records/bulk", record_ids,
+                                          lambda chunk: {"ids": chunk}, chunk_size, concurrency, retries)
+        for chunk, _ in self._succeeded(report, record_ids):
+            if self.replica:
+                self.replica.remove(table_id, chunk)
+            if self.search_index:
+                self.search_index.remove(table_id, chunk)
+        return report
+    
+    # Export
+    async def iter_records(self, table_id: str, page_size: int = NOCODB_EXPORT_PAGE_SIZE,
+                           fields: Optional[List[str]] = None, where: Optional[str] = None,
+                           sort: Optional[List[str]] = None,
+                           concurrency: int = NOCODB_SCAN_CONCURRENCY) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield a table page by page, in order.
+        
+        The first page reports pageInfo.totalRows; the remaining pages are then
+        prefetched concurrently, at most `concurrency` at a time. NocoDB caps
+        `limit` (DB_QUERY_LIMIT_MAX, 1000 by default), so a page shorter than
+        page_size does not mean the table has ended: offsets advance by the rows
+        actually returned and the scan ends on pageInfo.isLastPage/totalRows.
+        """
+        async def fetch(offset: int) -> Dict[str, Any]:
+            return await self.list_records(table_id, limit=page_size, offset=offset,
+                                           fields=fields, where=where, sort=sort)
+        
+        page = await fetch(0)
+        rows = page.get("list", [])
+        page_info = page.get("pageInfo", {})
+        if rows:
+            yield rows
+        total = page_info.get("totalRows")
+        if not rows or page_info.get("isLastPage") or (total is not None and len(rows) >= total):
+            return
+        
+        step = len(rows)
+        if total is None or concurrency <= 1:
+            # Without a row count the pages can only be followed one after another
+            offset = step
+            while True:
+                page = await fetch(offset)
+                rows = page.get("list", [])
+                if rows:
+                    yield rows
+                offset += len(rows)
+                if not rows or page.get("pageInfo", {}).get("isLastPage") or (total is not None and offset >= total):
+                    return
+        
+        offsets = iter(range(step, total, step))
+        pending = deque(asyncio.create_task(fetch(offset)) for offset in islice(offsets, concurrency))
+        try:
+            while pending:
+                page = await pending.popleft()
+                for offset in islice(offsets, 1):
+                    pending.append(asyncio.create_task(fetch(offset)))
+                rows = page.get("list", [])
+                if rows:
+                    yield rows
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def export_records(self, table_id: str, format: str = "ndjson",
+                             fields: Optional[List[str]] = None, where: Optional[str] = None,
+                             sort: Optional[List[str]] = None,
+                             page_size: int = NOCODB_EXPORT_PAGE_SIZE) -> AsyncIterator[bytes]:
+        """Stream a whole table as NDJSON or CSV, one upstream page at a time"""
+        header = None
+        async for rows in self.iter_records(table_id, page_size=page_size, fields=fields,
+                                            where=where, sort=sort):
+            if format == "ndjson":
+                yield "".join(dumps(row) + "\n" for row in rows).encode()
+                continue
+            buffer = io.StringIO()
+            if header is None:
+                header = list(fields) if fields else list(rows[0].keys())
+                csv.writer(buffer).writerow(header)
+            writer = csv.DictWriter(buffer, fieldnames=header, extrasaction="ignore")
+            for row in rows:
+                writer.writerow({
+                    key: dumps(value) if isinstance(value, (dict, list)) else value
+                    for key, value in row.items()
+                })
+            yield buffer.getvalue().encode()
+    
+    # Aggregation
+    async def aggregate_records(self, table_id: str, aggregates: List[str],
+                                group_by: Optional[List[str]] = None,
+                                where: Optional[str] = None) -> Dict[str, Any]:
+        """Group-by/sum/count/avg/min/max over a whole table, returning only the aggregate rows"""
+        try:
+            aggregator = Aggregator(group_by or [], aggregates)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        async for rows in self.iter_records(table_id, fields=aggregator.fields() or ["Id"], where=where):
+            aggregator.add(rows)
+        return aggregator.result()
     
     # Views
-    def list_views(self, table_id: str) -> List[Dict[str, Any]]:
-        return self._make_request("GET", f"/tables/{table_id}/views")
+    async def list_views(self, table_id: str) -> List[Dict[str, Any]]:
+        return await self.meta_cache.get_or_load(
+            "list_views", table_id,
+            lambda: self._make_request("GET", f"/tables/{table_id}/views")
+        )
     
-    def create_view(self, table_id: str, title: str, view_type: str = "grid") -> Dict[str, Any]:
+    async def create_view(self, table_id: str, title: str, view_type: str = "grid") -> Dict[str, Any]:
         data = {
             "title": title,
             "type": view_type
         }
-        return self._make_request("POST", f"/tables/{table_id}/views", json=data)
+        return await self._make_meta_request([("list_views", table_id)], "POST", f"/tables/{table_id}/views", json=data)
     
-    def update_view(self, view_id: str, title: Optional[str] = None) -> Dict[str, Any]:
+    async def update_view(self, view_id: str, title: Optional[str] = None) -> Dict[str, Any]:
         data = {}
         if title:
             data["title"] = title
-        return self._make_request("PATCH", f"/views/{view_id}", json=data)
+        return await self._make_meta_request([("list_views", None)], "PATCH", f"/views/{view_id}", json=data)
     
-    def delete_view(self, view_id: str) -> Dict[str, Any]:
-        return self._make_request("DELETE", f"/views/{view_id}")
+    async def delete_view(self, view_id: str) -> Dict[str, Any]:
+        return await self._make_meta_request([("list_views", None)], "DELETE", f"/views/{view_id}")
     
     # Filters
-    def list_filters(self, view_id: str) -> List[Dict[str, Any]]:
-        return self._make_request("GET", f"/views/{view_id}/filters")
+    async def list_filters(self, view_id: str) -> List[Dict[str, Any]]:
+        return await self._make_request("GET", f"/views/{view_id}/filters")
     
-    def create_filter(self, view_id: str, filter_data: Dict[str, Any]) -> Dict[str, Any]:
-        return self._make_request("POST", f"/views/{view_id}/filters", json=filter_data)
+    async def create_filter(self, view_id: str, filter_data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._make_request("POST", f"/views/{view_id}/filters", json=filter_data)
     
-    def update_filter(self, filter_id: str, filter_data: Dict[str, Any]) -> Dict[str, Any]:
-        return self._make_request("PATCH", f"/filters/{filter_id}", json=filter_data)
+    async def update_filter(self, filter_id: str, filter_data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._make_request("PATCH", f"/filters/{filter_id}", json=filter_data)
     
-    def delete_filter(self, filter_id: str) -> Dict[str, Any]:
-        return self._make_request("DELETE", f"/filters/{filter_id}")
+    async def delete_filter(self, filter_id: str) -> Dict[str, Any]:
+        return await self._make_request("DELETE", f"/filters/{filter_id}")
     
     # Sort
-    def list_sorts(self, view_id: str) -> List[Dict[str, Any]]:
-        return self._make_request("GET", f"/views/{view_id}/sorts")
+    async def list_sorts(self, view_id: str) -> List[Dict[str, Any]]:
+        return await self._make_request("GET", f"/views/{view_id}/sorts")
     
-    def create_sort(self, view_id: str, field: str, direction: str = "asc") -> Dict[str, Any]:
+    async def create_sort(self, view_id: str, field: str, direction: str = "asc") -> Dict[str, Any]:
         data = {
             "field": field,
             "direction": direction
         }
-        return self._make_request("POST", f"/views/{view_id}/sorts", json=data)
+        return await self._make_request("POST", f"/views/{view_id}/sorts", json=data)
     
-    def update_sort(self, sort_id: str, field: Optional[str] = None, direction: Optional[str] = None) -> Dict[str, Any]:
+    async def update_sort(self, sort_id: str, field: Optional[str] = None, direction: Optional[str] = None) -> Dict[str, Any]:
         data = {}
         if field:
             data["field"] = field
         if direction:
             data["direction"] = direction
-        return self._make_request("PATCH", f"/sorts/{sort_id}", json=data)
+        return await self._make_request("PATCH", f"/sorts/{sort_id}", json=data)
     
-    def delete_sort(self, sort_id: str) -> Dict[str, Any]:
-        return self._make_request("DELETE", f"/sorts/{sort_id}")
+    async def delete_sort(self, sort_id: str) -> Dict[str, Any]:
+        return await self._make_request("DELETE", f"/sorts/{sort_id}")
     
     # Shared views
-    def create_shared_view(self, view_id: str, password: Optional[str] = None) -> Dict[str, Any]:
+    async def create_shared_view(self, view_id: str, password: Optional[str] = None) -> Dict[str, Any]:
         data = {}
         if password:
             data["password"] = password
-        return self._make_request("POST", f"/views/{view_id}/share", json=data)
+        return await self._make_request("POST", f"/views/{view_id}/share", json=data)
     
-    def update_shared_view(self, view_id: str, password: Optional[str] = None) -> Dict[str, Any]:
+    async def update_shared_view(self, view_id: str, password: Optional[str] = None) -> Dict[str, Any]:
         data = {}
         if password:
             data["password"] = password
-        return self._make_request("PATCH", f"/views/{view_id}/share", json=data)
+        return await self._make_request("PATCH", f"/views/{view_id}/share", json=data)
     
-    def delete_shared_view(self, view_id: str) -> Dict[str, Any]:
-        return self._make_request("DELETE", f"/views/{view_id}/share")
+    async def delete_shared_view(self, view_id: str) -> Dict[str, Any]:
+        return await self._make_request("DELETE", f"/views/{view_id}/share")
     
     # Webhooks
-    def list_webhooks(self, table_id: str) -> List[Dict[str, Any]]:
-        return self._make_request("GET", f"/tables/{table_id}/hooks")
+    async def list_webhooks(self, table_id: str) -> List[Dict[str, Any]]:
+        return await self._make_request("GET", f"/tables/{table_id}/hooks")
     
-    def create_webhook(self, table_id: str, title: str, url: str, event: str, 
+    async def create_webhook(self, table_id: str, title: str, url: str, event: str, 
                       condition: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         data = {
             "title": title,
@@ -249,47 +844,89 @@ class NocoDBAPI:
         }
         if condition:
             data["condition"] = condition
-        return self._make_request("POST", f"/tables/{table_id}/hooks", json=data)
+        return await self._make_request("POST", f"/tables/{table_id}/hooks", json=data)
     
-    def update_webhook(self, hook_id: str, webhook_data: Dict[str, Any]) -> Dict[str, Any]:
-        return self._make_request("PATCH", f"/hooks/{hook_id}", json=webhook_data)
+    async def update_webhook(self, hook_id: str, webhook_data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._make_request("PATCH", f"/hooks/{hook_id}", json=webhook_data)
     
-    def delete_webhook(self, hook_id: str) -> Dict[str, Any]:
-        return self._make_request("DELETE", f"/hooks/{hook_id}")
+    async def delete_webhook(self, hook_id: str) -> Dict[str, Any]:
+        return await self._make_request("DELETE", f"/hooks/{hook_id}")
     
     # Global search
-    def global_search(self, query: str) -> Dict[str, Any]:
-        return self._make_request("GET", f"/search", params={"q": query})
+    async def global_search(self, query: str, limit: int = 25, tables: Optional[List[str]] = None,
+                            remote: bool = False) -> Dict[str, Any]:
+        # Answered from the local index once every indexed table has been loaded
+        if self.search_index and self.search_index.ready and not remote:
+            return {"list": self.search_index.search(query, limit, tables), "source": "index"}
+        return await self._make_request("GET", f"/search", params={"q": query})
     
     # Comments
-    def list_comments(self, table_id: str, record_id: str) -> List[Dict[str, Any]]:
-        return self._make_request("GET", f"/tables/{table_id}/records/{record_id}/comments")
+    async def list_comments(self, table_id: str, record_id: str) -> List[Dict[str, Any]]:
+        return await self._make_request("GET", f"/tables/{table_id}/records/{record_id}/comments")
     
-    def create_comment(self, table_id: str, record_id: str, comment: str) -> Dict[str, Any]:
+    async def create_comment(self, table_id: str, record_id: str, comment: str) -> Dict[str, Any]:
         data = {"comment": comment}
-        return self._make_request("POST", f"/tables/{table_id}/records/{record_id}/comments", json=data)
+        return await self._make_request("POST", f"/tables/{table_id}/records/{record_id}/comments", json=data)
     
-    def update_comment(self, comment_id: str, comment: str) -> Dict[str, Any]:
+    async def update_comment(self, comment_id: str, comment: str) -> Dict[str, Any]:
         data = {"comment": comment}
-        return self._make_request("PATCH", f"/comments/{comment_id}", json=data)
+        return await self._make_request("PATCH", f"/comments/{comment_id}", json=data)
     
-    def delete_comment(self, comment_id: str) -> Dict[str, Any]:
-        return self._make_request("DELETE", f"/comments/{comment_id}")
+    async def delete_comment(self, comment_id: str) -> Dict[str, Any]:
+        return await self._make_request("DELETE", f"/comments/{comment_id}")
     
     # File upload
-    def upload_file(self, storage: str, file_path: str) -> Dict[str, Any]:
+    async def upload_file(self, storage: str, file_path: str,
+                          on_progress: Optional[Callable[[str, int, int], None]] = None) -> List[Dict[str, Any]]:
+        """Stream one file from disk to NocoDB storage; returns the attachment descriptors"""
+        total = os.path.getsize(file_path)
+        progress = {"sent": 0, "reported": 0}
+        
+        def on_read(size: int):
+            progress["sent"] += size
+            if on_progress and (progress["sent"] - progress["reported"] >= UPLOAD_PROGRESS_STEP
+                                or progress["sent"] >= total):
+                progress["reported"] = progress["sent"]
+                on_progress(file_path, progress["sent"], total)
+        
         with open(file_path, 'rb') as f:
-            files = {'file': f}
-            response = requests.post(
-                f"{self.base_url}/storage/upload",
-                headers={"xc-token": self.api_key},
-                params={"storage": storage},
-                files=files
-            )
-            return response.json()
+            content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+            files = {'file': (os.path.basename(file_path), _ProgressFile(f, on_read), content_type)}
+            return await self._make_request("POST", "/storage/upload", params={"storage": storage}, files=files)
+    
+    async def upload_files(self, storage: str, file_paths: List[str], concurrency: Optional[int] = None,
+                           on_progress: Optional[Callable[[str, int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Upload many files, a bounded number at a time. `attachments` holds every
+        descriptor returned by NocoDB, ready to be written to an attachment column.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency or NOCODB_UPLOAD_CONCURRENCY))
+        
+        async def upload(file_path: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    descriptors = await self.upload_file(storage, file_path, on_progress)
+                except HTTPException as e:
+                    return {"file": file_path, "status": "error", "error": e.detail}
+                except OSError as e:
+                    return {"file": file_path, "status": "error", "error": str(e)}
+            if isinstance(descriptors, dict):
+                descriptors = [descriptors]
+            return {"file": file_path, "status": "ok", "attachments": descriptors}
+        
+        files = await asyncio.gather(*[upload(file_path) for file_path in file_paths])
+        succeeded = sum(1 for f in files if f["status"] == "ok")
+        return {
+            "attachments": [d for f in files if f["status"] == "ok" for d in f["attachments"]],
+            "succeeded": succeeded,
+            "failed": len(files) - succeeded,
+            "files": files
+        }
 
 # Initialize API
 api = NocoDBAPI()
+tools = ToolRegistry.from_methods(api, TOOL_DESCRIPTIONS)
+singleflight = SingleFlight()
 
 # Routes
 @app.get("/")
@@ -300,100 +937,171 @@ async def root():
         "docs": "/docs"
     }
 
+@app.on_event("startup")
+async def startup_event():
+    if api.replica:
+        api.replica.start(api)
+    if api.search_index:
+        api.search_index.start(api)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await api.close()
+
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "pool": api.pool_stats(),
+        "metadata_cache": api.meta_cache.stats(),
+        "singleflight": singleflight.stats(),
+        "create_batching": api.create_batcher.stats() if api.create_batcher else None,
+        "replica": api.replica.stats() if api.replica else None,
+        "search_index": api.search_index.stats() if api.search_index else None
+    }
 
 @app.get("/tools")
 async def list_tools():
-    return {
-        "tools": [
-            # Bases
-            {"name": "list_bases", "description": "List all bases"},
-            {"name": "get_base", "description": "Get specific base"},
-            {"name": "create_base", "description": "Create new base"},
-            {"name": "update_base", "description": "Update existing base"},
-            {"name": "delete_base", "description": "Delete base"},
-            
-            # Tables
-            {"name": "list_tables", "description": "List all tables in a base"},
-            {"name": "get_table", "description": "Get specific table"},
-            {"name": "create_table", "description": "Create new table"},
-            {"name": "update_table", "description": "Update existing table"},
-            {"name": "delete_table", "description": "Delete table"},
-            
-            # Columns
-            {"name": "list_columns", "description": "List all columns in a table"},
-            {"name": "create_column", "description": "Create new column"},
-            {"name": "update_column", "description": "Update existing column"},
-            {"name": "delete_column", "description": "Delete column"},
-            
-            # Records
-            {"name": "list_records", "description": "List all records in a table"},
-            {"name": "get_record", "description": "Get specific record"},
-            {"name": "create_record", "description": "Create new record"},
-            {"name": "update_record", "description": "Update existing record"},
-            {"name": "delete_record", "description": "Delete record"},
-            
-            # Bulk operations
-            {"name": "bulk_create_records", "description": "Create multiple records"},
-            {"name": "bulk_update_records", "description": "Update multiple records"},
-            {"name": "bulk_delete_records", "description": "Delete multiple records"},
-            
-            # Views
-            {"name": "list_views", "description": "List all views in a table"},
-            {"name": "create_view", "description": "Create new view"},
-            {"name": "update_view", "description": "Update existing view"},
-            {"name": "delete_view", "description": "Delete view"},
-            
-            # Filters
-            {"name": "list_filters", "description": "List all filters in a view"},
-            {"name": "create_filter", "description": "Create new filter"},
-            {"name": "update_filter", "description": "Update existing filter"},
-            {"name": "delete_filter", "description": "Delete filter"},
-            
-            # Sort
-            {"name": "list_sorts", "description": "List all sorts in a view"},
-            {"name": "create_sort", "description": "Create new sort"},
-            {"name": "update_sort", "description": "Update existing sort"},
-            {"name": "delete_sort", "description": "Delete sort"},
-            
-            # Shared views
-            {"name": "create_shared_view", "description": "Create shared view"},
-            {"name": "update_shared_view", "description": "Update shared view"},
-            {"name": "delete_shared_view", "description": "Delete shared view"},
-            
-            # Webhooks
-            {"name": "list_webhooks", "description": "List all webhooks"},
-            {"name": "create_webhook", "description": "Create new webhook"},
-            {"name": "update_webhook", "description": "Update existing webhook"},
-            {"name": "delete_webhook", "description": "Delete webhook"},
-            
-            # Other
-            {"name": "global_search", "description": "Search across all data"},
-            {"name": "list_comments", "description": "List all comments for a record"},
-            {"name": "create_comment", "description": "Create new comment"},
-            {"name": "update_comment", "description": "Update existing comment"},
-            {"name": "delete_comment", "description": "Delete comment"},
-            {"name": "upload_file", "description": "Upload file to storage"}
-        ]
-    }
+    return Response(content=tools.listing_json, media_type="application/json")
+
+async def export_response(table_id: str, format: str = "ndjson", **kwargs) -> StreamingResponse:
+    """Build a streaming export, failing fast if the first page cannot be read"""
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    
+    chunks = api.export_records(table_id, format=format, **kwargs)
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    
+    async def stream():
+        yield first
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except Exception as e:
+            logger.error(f"Export of table {table_id} aborted: {e}")
+    
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table_id}.{format}"'}
+    )
+
+@app.get("/export/{table_id}")
+async def export_table(table_id: str, format: str = "ndjson", fields: Optional[str] = None,
+                       where: Optional[str] = None, sort: Optional[List[str]] = Query(None),
+                       page_size: int = NOCODB_EXPORT_PAGE_SIZE):
+    """Stream every record of a table as NDJSON or CSV"""
+    return await export_response(
+        table_id,
+        format=format,
+        fields=fields.split(",") if fields else None,
+        where=where,
+        sort=sort,
+        page_size=page_size
+    )
+
+@app.post("/upload")
+async def upload_files(request: UploadRequest):
+    """Upload files concurrently, streaming NDJSON progress events and a final "done" event"""
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def on_progress(file_path: str, sent: int, total: int):
+        events.put_nowait({"event": "progress", "file": file_path, "sent": sent, "total": total})
+    
+    async def run():
+        try:
+            result = await api.upload_files(request.storage, request.file_paths,
+                                            request.concurrency, on_progress)
+            events.put_nowait({"event": "done", **result})
+        except Exception as e:
+            logger.error(f"Upload batch failed: {e}")
+            events.put_nowait({"event": "error", "error": str(e)})
+    
+    async def stream():
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event = await events.get()
+                yield dumps(event) + "\n"
+                if event["event"] != "progress":
+                    break
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(stream(), media_type=EXPORT_MEDIA_TYPES["ndjson"])
+
+def check_args(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate tool arguments against the registry before anything is sent to NocoDB"""
+    if tool_name not in tools:
+        raise HTTPException(status_code=400, detail=f"Unknown tool: {tool_name}")
+    try:
+        return tools.validate(tool_name, args)
+    except ToolArgumentError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid arguments for {tool_name}: {e}")
+
+async def run_tool(tool_name: str, args: Dict[str, Any]) -> Any:
+    """Run one tool against NocoDBAPI, sharing identical in-flight read-only calls"""
+    args = check_args(tool_name, args)
+    method = getattr(api, tool_name)
+    
+    # Execute the method with the provided arguments
+    if tool_name in READ_ONLY_TOOLS:
+        # Equivalent filters share one key: "(a,eq,1)~and(b,gt,2)" == "(b,gt,2)~and(a,eq,1)"
+        key_args = args
+        if isinstance(args.get("where"), str):
+            key_args = {**args, "where": canonical_where(check_where(args["where"]))}
+        key = (tool_name, dumps(key_args, sort_keys=True))
+        return await singleflight.do(key, lambda: method(**args))
+    return await method(**args)
+
+@app.post("/execute/pipeline")
+async def execute_pipeline(request: PipelineRequest):
+    """
+    Run a DAG of tool calls in one round trip. Args may reference earlier
+    results with "${step_id.path.to.field}"; independent steps run concurrently.
+    """
+    steps = [step.model_dump() for step in request.steps]
+    streaming = [step["id"] for step in steps if step["tool"] == "export_records"]
+    if streaming:
+        raise HTTPException(status_code=400, detail=f"export_records cannot run in a pipeline (steps: {', '.join(streaming)})")
+    
+    def describe(e: Exception) -> str:
+        return e.detail if isinstance(e, HTTPException) else str(e)
+    
+    try:
+        results = await pipeline.run(steps, run_tool, on_error=describe)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"results": results}
+
+def conditional_response(payload: Dict[str, Any], if_none_match: Optional[str]) -> Response:
+    """JSON response carrying a weak content-hash ETag; 304 when the client already has it"""
+    body = dumpb(payload)
+    etag = content_etag(body, weak=True)
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 @app.post("/execute")
-async def execute_tool(request: ExecuteRequest):
+async def execute_tool(request: ExecuteRequest, http_request: Request):
     """Execute a specific tool with the provided arguments"""
     tool_name = request.tool
     args = request.args
     
+    if tool_name == "export_records":
+        return await export_response(**check_args(tool_name, args))
+    
     try:
-        # Map tool names to API methods
-        method = getattr(api, tool_name, None)
-        if method is None:
-            raise HTTPException(status_code=400, detail=f"Unknown tool: {tool_name}")
-        
-        # Execute the method with the provided arguments
-        result = method(**args)
+        result = await run_tool(tool_name, args)
+        if tool_name in READ_ONLY_TOOLS:
+            return conditional_response({"result": result}, http_request.headers.get("if-none-match"))
         return {"result": result}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error executing tool {tool_name}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,70 @@
+"""
+JSON serialization shared by the HTTP servers, gateways and the MCP stdio server
+
+Uses orjson when it is installed and falls back to the stdlib json module.
+NOCODB_JSON_BACKEND=json forces the stdlib (e.g. to compare output).
+"""
+
+import json
+import os
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from starlette.responses import JSONResponse
+except ImportError:
+    # The stdio MCP server runs without the web stack
+    JSONResponse = None
+
+JSON_BACKEND = "orjson" if orjson is not None and os.getenv("NOCODB_JSON_BACKEND", "auto") != "json" else "json"
+
+JSONDecodeError = json.JSONDecodeError
+
+
+def dumpb(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 bytes; unknown types are converted with str()"""
+    if JSON_BACKEND == "orjson":
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=str, option=option)
+        except TypeError:
+            # Integers beyond 64 bits and similar edge cases
+            pass
+    return json.dumps(obj, default=str, sort_keys=sort_keys, indent=2 if indent else None,
+                      ensure_ascii=False).encode()
+
+
+def dumps(obj: Any, sort_keys: bool = False, indent: bool = False) -> str:
+    return dumpb(obj, sort_keys=sort_keys, indent=indent).decode()
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    if JSON_BACKEND == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def fragment(data: bytes, parsed: Any = None) -> Any:
+    """
+    Already-serialized JSON that dumpb embeds as is (orjson >= 3.9); with older
+    backends the parsed value (when the caller has it) or data parsed again
+    """
+    if JSON_BACKEND == "orjson" and hasattr(orjson, "Fragment"):
+        return orjson.Fragment(data)
+    return parsed if parsed is not None else loads(data)
+
+
+if JSONResponse is not None:
+    class FastJSONResponse(JSONResponse):
+        """Default FastAPI response class rendering with the fast serializer"""
+
+        def render(self, content: Any) -> bytes:
+            return dumpb(content)
@@ -0,0 +1,118 @@
+"""
+NocoDB keyset (cursor) pagination helpers
+
+Pages are selected with a `where` predicate on a monotonic key instead of an
+offset, so deep pages cost the same as the first one. The cursor returned to
+the caller is opaque: a base64 token holding the key column, the direction and
+the last key value seen.
+"""
+
+import base64
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CURSOR_FIELD = "Id"
+
+_NUMBER = re.compile(r"^-?\d+(\.\d+)?$")
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(state, dict) or "field" not in state or "value" not in state:
+        raise ValueError("Invalid cursor")
+    key_value(state["field"], state["value"])
+    if "id" in state:
+        key_value(DEFAULT_CURSOR_FIELD, state["id"])
+    return state
+
+
+def key_value(field: str, value: Any) -> Any:
+    """
+    Check that a key value can be written into a `(field,op,value)` predicate.
+    Only numbers are accepted: text may contain `,` or `)` and dates need the
+    exactDate sub-operator, so keyset pages are limited to numeric keys and Id.
+    """
+    if isinstance(value, bool) or not (isinstance(value, (int, float)) or
+                                       (isinstance(value, str) and _NUMBER.match(value))):
+        raise ValueError(f"Cursor pagination needs a numeric sort key; {field} has value {value!r}. "
+                         f"Sort by Id or a numeric column, or use offset pagination")
+    return value
+
+
+def _predicate(field: str, op: str, value: Any) -> str:
+    return f"({field},{op},{key_value(field, value)})"
+
+
+def keyset_query(where: Optional[str] = None, sort: Optional[str] = None,
+                 cursor: Optional[str] = None) -> Tuple[Optional[str], List[str], Dict[str, Any]]:
+    """
+    Build the (where, sort) pair for one keyset page.
+
+    The key comes from the first `sort` entry (e.g. "-CreatedAt"), defaulting to Id.
+    Non-Id keys are paired with Id as a tie-breaker so duplicate values are not skipped.
+    Returns the state needed by `next_cursor`.
+    """
+    if cursor:
+        state = decode_cursor(cursor)
+        field, desc = state["field"], state.get("desc", False)
+    else:
+        state = {}
+        key = (sort or "").split(",")[0].strip() or DEFAULT_CURSOR_FIELD
+        field, desc = key.lstrip("-"), key.startswith("-")
+
+    order = "-" if desc else ""
+    sort_params = [f"{order}{field}"]
+    if field != DEFAULT_CURSOR_FIELD:
+        sort_params.append(f"{order}{DEFAULT_CURSOR_FIELD}")
+
+    predicate = None
+    if cursor:
+        op = "lt" if desc else "gt"
+        predicate = _predicate(field, op, state["value"])
+        if field != DEFAULT_CURSOR_FIELD:
+            predicate = (f"({predicate}~or({_predicate(field, 'eq', state['value'])}"
+                         f"~and{_predicate(DEFAULT_CURSOR_FIELD, op, state['id'])}))")
+
+    if where and predicate:
+        where = f"({where})~and{predicate}"
+    elif predicate:
+        where = predicate
+
+    return where, sort_params, {"field": field, "desc": desc}
+
+
+def next_cursor(rows: List[Dict[str, Any]], state: Dict[str, Any],
+                page_info: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Cursor for the page after `rows`, or None when this was the last page.
+    The end is taken from pageInfo.isLastPage: NocoDB caps `limit` at
+    DB_QUERY_LIMIT_MAX, so a page shorter than requested is not the last one.
+    """
+    if not rows or (page_info or {}).get("isLastPage"):
+        return None
+    last = rows[-1]
+    field = state["field"]
+    if field not in last:
+        raise ValueError(f"Cursor field {field} missing from records")
+    token = {"field": field, "desc": state["desc"], "value": key_value(field, last[field])}
+    if field != DEFAULT_CURSOR_FIELD:
+        token["id"] = key_value(DEFAULT_CURSOR_FIELD, last.get(DEFAULT_CURSOR_FIELD))
+    return encode_cursor(token)
+
+
+def cursor_fields(fields: Optional[List[str]], state: Dict[str, Any]) -> Optional[List[str]]:
+    """Make sure the key columns survive a `fields` projection"""
+    if not fields:
+        return fields
+    required = [state["field"], DEFAULT_CURSOR_FIELD]
+    return list(fields) + [name for name in required if name not in fields]
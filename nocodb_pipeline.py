@@ -0,0 +1,111 @@
+"""
+Pipelines of tool calls executed as a DAG
+
+A step's args may reference fields of earlier results with "${step_id.path.to.field}".
+A string that is exactly one reference is replaced by the referenced value (any JSON
+type); references embedded in a longer string are interpolated as text. Steps with no
+pending dependencies run concurrently.
+"""
+
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Set
+
+REFERENCE = re.compile(r"\$\{([A-Za-z0-9_\-]+)((?:\.[^.}]+)*)\}")
+
+
+def _references(value: Any) -> Set[str]:
+    if isinstance(value, str):
+        return {match.group(1) for match in REFERENCE.finditer(value)}
+    if isinstance(value, dict):
+        return set().union(*(_references(v) for v in value.values())) if value else set()
+    if isinstance(value, list):
+        return set().union(*(_references(v) for v in value)) if value else set()
+    return set()
+
+
+def _lookup(results: Dict[str, Any], step_id: str, path: str) -> Any:
+    value = results[step_id]
+    for part in filter(None, path.split(".")):
+        if isinstance(value, list):
+            try:
+                value = value[int(part)]
+            except (ValueError, IndexError):
+                raise ValueError(f"Reference ${{{step_id}{path}}}: no item {part}")
+        elif isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            raise ValueError(f"Reference ${{{step_id}{path}}}: no field {part}")
+    return value
+
+
+def resolve(value: Any, results: Dict[str, Any]) -> Any:
+    """Substitute references in `value` with fields of completed step results"""
+    if isinstance(value, str):
+        match = REFERENCE.fullmatch(value)
+        if match:
+            return _lookup(results, match.group(1), match.group(2))
+        return REFERENCE.sub(lambda m: str(_lookup(results, m.group(1), m.group(2))), value)
+    if isinstance(value, dict):
+        return {key: resolve(v, results) for key, v in value.items()}
+    if isinstance(value, list):
+        return [resolve(v, results) for v in value]
+    return value
+
+
+def plan(steps: List[Dict[str, Any]]) -> Dict[str, Set[str]]:
+    """Validate the steps and return each step's dependencies; raises ValueError"""
+    ids = [step["id"] for step in steps]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Step ids must be unique")
+
+    dependencies = {}
+    for step in steps:
+        deps = _references(step.get("args", {})) | set(step.get("depends_on", []))
+        unknown = deps - set(ids)
+        if unknown:
+            raise ValueError(f"Step {step['id']} references unknown steps: {', '.join(sorted(unknown))}")
+        dependencies[step["id"]] = deps
+
+    # Kahn's algorithm, only to reject cycles before anything runs
+    remaining = {step_id: set(deps) for step_id, deps in dependencies.items()}
+    while remaining:
+        ready = [step_id for step_id, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Pipeline has a dependency cycle between: {', '.join(sorted(remaining))}")
+        for step_id in ready:
+            del remaining[step_id]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return dependencies
+
+
+async def run(steps: List[Dict[str, Any]], call: Callable[[str, Dict[str, Any]], Awaitable[Any]],
+              on_error: Callable[[Exception], str] = str) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every step as soon as its dependencies have finished. A failed step
+    marks the steps depending on it as skipped; independent steps still run.
+    """
+    dependencies = plan(steps)
+    results: Dict[str, Any] = {}
+    outcomes: Dict[str, Dict[str, Any]] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run_step(step: Dict[str, Any]):
+        deps = dependencies[step["id"]]
+        await asyncio.gather(*(tasks[dep] for dep in deps))
+        failed = sorted(dep for dep in deps if outcomes[dep]["status"] != "ok")
+        if failed:
+            outcomes[step["id"]] = {"status": "skipped", "error": f"Depends on failed steps: {', '.join(failed)}"}
+            return
+        try:
+            args = resolve(step.get("args", {}), results)
+            results[step["id"]] = await call(step["tool"], args)
+            outcomes[step["id"]] = {"status": "ok", "result": results[step["id"]]}
+        except Exception as e:
+            outcomes[step["id"]] = {"status": "error", "error": on_error(e)}
+
+    for step in steps:
+        tasks[step["id"]] = asyncio.ensure_future(run_step(step))
+    await asyncio.gather(*tasks.values())
+    return {step["id"]: outcomes[step["id"]] for step in steps}
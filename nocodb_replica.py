@@ -0,0 +1,254 @@
+"""
+Local SQLite read replica of selected NocoDB tables
+
+Each configured table is bulk-loaded once through list_records, then kept up to
+date incrementally with an UpdatedAt watermark. Watermarks cannot see
+deletions: records deleted through the server are removed from the replica
+directly, and a periodic full resync picks up the others. Records are stored as
+JSON documents, so the replica needs no knowledge of the table schema.
+
+Rows read during a sync are collected in a staging table and applied to
+`records` in one transaction once the last page has arrived, so readers never
+see a half-loaded table. Reads are served from the replica only when the caller
+accepts the current staleness and no write to the table has passed through the
+server since the start of the last sync.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from nocodb_json import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    table_id TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    position,
+    updated_at TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (table_id, record_id)
+);
+CREATE INDEX IF NOT EXISTS records_position ON records (table_id, position);
+CREATE TABLE IF NOT EXISTS staging (
+    table_id TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    position,
+    updated_at TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (table_id, record_id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    table_id TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at REAL,
+    full_synced_at REAL
+);
+"""
+
+
+def _sort_key(field: str) -> Callable[[Dict[str, Any]], tuple]:
+    def key(row: Dict[str, Any]) -> tuple:
+        value = row.get(field)
+        # None sorts last; mixed types are ordered by type name first
+        return (value is None, type(value).__name__, value if value is not None else 0)
+    return key
+
+
+class Replica:
+    def __init__(self, path: str, tables: List[str], sync_interval: float = 30,
+                 full_sync_interval: float = 3600):
+        self.path = path
+        self.tables = set(tables)
+        self.sync_interval = sync_interval
+        self.full_sync_interval = full_sync_interval
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self.dirty = set()
+        self.writes: Dict[str, int] = {}
+        self.removed: Dict[str, Set[str]] = {}  # ids deleted through the server, per table
+        self.hits = 0
+        self.misses = 0
+        self._task: Optional[asyncio.Task] = None
+
+    # Sync
+    async def sync_table(self, api, table_id: str):
+        """Bring one table up to date; full reload when it has never been loaded or is due"""
+        state = self.db.execute(
+            "SELECT watermark, full_synced_at FROM sync_state WHERE table_id = ?", (table_id,)
+        ).fetchone()
+        now = time.time()
+        full = state is None or state[1] is None or now - state[1] >= self.full_sync_interval
+        writes_before = self.writes.get(table_id, 0)
+        removed_before = set(self.removed.get(table_id, ()))
+
+        where = None
+        if not full and state[0]:
+            # gte: rows updated within the watermark second are simply upserted again
+            where = f"(UpdatedAt,gte,exactDate,{state[0]})"
+
+        watermark = None if full else state[0]
+        count = 0
+        try:
+            with self.db:
+                self.db.execute("DELETE FROM staging WHERE table_id = ?", (table_id,))
+            async for rows in api.iter_records(table_id, where=where):
+                with self.db:
+                    self.db.executemany(
+                        "INSERT OR REPLACE INTO staging (table_id, record_id, position, updated_at, data) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        [(table_id, str(row.get("Id")), row.get("Id"), row.get("UpdatedAt"), dumps(row))
+                         for row in rows]
+                    )
+                count += len(rows)
+                for row in rows:
+                    updated_at = row.get("UpdatedAt")
+                    if updated_at and (watermark is None or str(updated_at) > watermark):
+                        watermark = str(updated_at)
+
+            # Nothing is awaited from here on: readers see the old rows or the new ones, never a mix
+            with self.db:
+                if full:
+                    self.db.execute("DELETE FROM records WHERE table_id = ?", (table_id,))
+                self.db.execute(
+                    "INSERT OR REPLACE INTO records (table_id, record_id, position, updated_at, data) "
+                    "SELECT table_id, record_id, position, updated_at, data FROM staging WHERE table_id = ?",
+                    (table_id,)
+                )
+                # Pages read before a delete reached NocoDB may still hold the deleted rows
+                self.db.executemany(
+                    "DELETE FROM records WHERE table_id = ? AND record_id = ?",
+                    [(table_id, record_id) for record_id in self.removed.get(table_id, ())]
+                )
+                self.db.execute(
+                    "INSERT OR REPLACE INTO sync_state (table_id, watermark, synced_at, full_synced_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (table_id, watermark, now, now if full else state[1])
+                )
+        finally:
+            with self.db:
+                self.db.execute("DELETE FROM staging WHERE table_id = ?", (table_id,))
+        # Deletes made before this sync started cannot be in any of its pages
+        self.removed.get(table_id, set()).difference_update(removed_before)
+        # A write that arrived while this sync ran may be missing from the pages already read
+        if self.writes.get(table_id, 0) == writes_before:
+            self.dirty.discard(table_id)
+        logger.info(f"Replica {'full' if full else 'incremental'} sync of {table_id}: {count} rows")
+
+    async def sync_all(self, api):
+        for table_id in sorted(self.tables):
+            try:
+                await self.sync_table(api, table_id)
+            except Exception as e:
+                logger.error(f"Replica sync of {table_id} failed: {e}")
+
+    def start(self, api):
+        async def loop():
+            while True:
+                await self.sync_all(api)
+                await asyncio.sleep(self.sync_interval)
+        self._task = asyncio.create_task(loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+        self.db.close()
+
+    def mark_dirty(self, table_id: str):
+        if table_id in self.tables:
+            self.dirty.add(table_id)
+            self.writes[table_id] = self.writes.get(table_id, 0) + 1
+
+    def remove(self, table_id: str, record_ids: Iterable[Any]):
+        """Drop records deleted through the server; incremental syncs would never see them go"""
+        if table_id not in self.tables:
+            return
+        record_ids = [str(record_id) for record_id in record_ids]
+        with self.db:
+            self.db.executemany("DELETE FROM records WHERE table_id = ? AND record_id = ?",
+                                [(table_id, record_id) for record_id in record_ids])
+        self.removed.setdefault(table_id, set()).update(record_ids)
+
+    # Reads
+    def age(self, table_id: str) -> Optional[float]:
+        """Seconds since the table was last synced, None when it cannot be served locally"""
+        if table_id not in self.tables or table_id in self.dirty:
+            return None
+        state = self.db.execute("SELECT synced_at FROM sync_state WHERE table_id = ?", (table_id,)).fetchone()
+        if state is None or state[0] is None:
+            return None
+        return time.time() - state[0]
+
+    def _fresh(self, table_id: str, max_staleness: float) -> Optional[float]:
+        age = self.age(table_id)
+        if age is None or age > max_staleness:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return age
+
+    def list_records(self, table_id: str, max_staleness: float, limit: int = 25, offset: int = 0,
+                     fields: Optional[List[str]] = None, sort: Optional[List[str]] = None,
+                     predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Optional[Dict[str, Any]]:
+        """
+        A list_records page from the replica, or None when it is too stale to use.
+        The page is identical to NocoDB's, so ETags match whichever source served it;
+        replica ages are reported by stats().
+        """
+        age = self._fresh(table_id, max_staleness)
+        if age is None:
+            return None
+
+        if sort or predicate:
+            rows = [loads(data) for (data,) in self.db.execute(
+                "SELECT data FROM records WHERE table_id = ? ORDER BY position", (table_id,)
+            )]
+            if predicate:
+                rows = [row for row in rows if predicate(row)]
+            for entry in reversed(sort or []):
+                rows.sort(key=_sort_key(entry.lstrip("-")), reverse=entry.startswith("-"))
+            total = len(rows)
+            rows = rows[offset:offset + limit]
+        else:
+            total = self.db.execute("SELECT COUNT(*) FROM records WHERE table_id = ?", (table_id,)).fetchone()[0]
+            rows = [loads(data) for (data,) in self.db.execute(
+                "SELECT data FROM records WHERE table_id = ? ORDER BY position LIMIT ? OFFSET ?",
+                (table_id, limit, offset)
+            )]
+
+        if fields:
+            rows = [{key: row[key] for key in fields if key in row} for row in rows]
+        return {
+            "list": rows,
+            "pageInfo": {
+                "totalRows": total,
+                "page": offset // max(limit, 1) + 1,
+                "pageSize": limit,
+                "isFirstPage": offset == 0,
+                "isLastPage": offset + limit >= total
+            }
+        }
+
+    def get_record(self, table_id: str, record_id: str, max_staleness: float) -> Optional[Dict[str, Any]]:
+        if self._fresh(table_id, max_staleness) is None:
+            return None
+        row = self.db.execute(
+            "SELECT data FROM records WHERE table_id = ? AND record_id = ?", (table_id, str(record_id))
+        ).fetchone()
+        return loads(row[0]) if row else None
+
+    def stats(self) -> Dict[str, Any]:
+        tables = {}
+        for table_id in sorted(self.tables):
+            rows = self.db.execute("SELECT COUNT(*) FROM records WHERE table_id = ?", (table_id,)).fetchone()[0]
+            age = self.age(table_id)
+            tables[table_id] = {
+                "rows": rows,
+                "age": round(age, 3) if age is not None else None,
+                "dirty": table_id in self.dirty
+            }
+        return {"hits": self.hits, "misses": self.misses, "tables": tables}
@@ -0,0 +1,136 @@
+"""
+NocoDB schema exposed as MCP resources
+
+    nocodb://bases                                    bases
+    nocodb://base/{base_id}/tables                    tables of a base
+    nocodb://base/{base_id}/table/{table_id}/schema   table metadata with its columns
+
+Resources are served from local snapshots of the NocoDB meta API responses. A
+snapshot is reused until it expires or a schema change made through the server
+makes it stale. Storing a new snapshot reports whether its content changed,
+which drives the resources/subscribe notifications.
+"""
+
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from nocodb_cache import content_etag
+
+BASES_URI = "nocodb://bases"
+
+_URIS = [
+    (re.compile(r"^nocodb://bases$"), "bases"),
+    (re.compile(r"^nocodb://base/([^/]+)/tables$"), "tables"),
+    (re.compile(r"^nocodb://base/([^/]+)/table/([^/]+)/schema$"), "schema")
+]
+
+# Tools whose success changes the set (or the names) of listed resources
+LIST_CHANGING_TOOLS = {"create_base", "update_base", "delete_base", "create_table", "update_table", "delete_table"}
+
+
+def tables_uri(base_id: str) -> str:
+    return f"nocodb://base/{base_id}/tables"
+
+
+def schema_uri(base_id: str, table_id: str) -> str:
+    return f"nocodb://base/{base_id}/table/{table_id}/schema"
+
+
+def parse_uri(uri: str) -> Tuple[str, Tuple[str, ...]]:
+    """Split a resource URI into its kind ("bases", "tables", "schema") and ids"""
+    for pattern, kind in _URIS:
+        match = pattern.match(uri or "")
+        if match:
+            return kind, match.groups()
+    raise ValueError(f"Unknown resource URI: {uri!r}")
+
+
+def resource_endpoint(uri: str) -> str:
+    """NocoDB meta API endpoint a resource is read from"""
+    kind, ids = parse_uri(uri)
+    if kind == "bases":
+        return "/meta/bases"
+    if kind == "tables":
+        return f"/meta/bases/{ids[0]}/tables"
+    return f"/meta/tables/{ids[1]}"
+
+
+def stale_resources(tool_name: str, arguments: Dict[str, Any]) -> Optional[Callable[[str, Optional[str]], bool]]:
+    """
+    Predicate over (uri, snapshot text) selecting the resources a successful
+    call of the tool changes; None for tools that do not touch the schema.
+    Column ids do not say which table they belong to, so column updates match
+    the schemas whose snapshot mentions the column.
+    """
+    base_id = arguments.get("base_id")
+    table_id = arguments.get("table_id")
+    column_id = arguments.get("column_id")
+    if tool_name == "create_base":
+        return lambda uri, text: uri == BASES_URI
+    if tool_name in ("update_base", "delete_base"):
+        return lambda uri, text: uri == BASES_URI or uri.startswith(f"nocodb://base/{base_id}/")
+    if tool_name == "create_table":
+        return lambda uri, text: uri == tables_uri(base_id)
+    if tool_name in ("update_table", "delete_table"):
+        return lambda uri, text: uri.endswith("/tables") or uri.endswith(f"/table/{table_id}/schema")
+    if tool_name == "create_column":
+        return lambda uri, text: uri.endswith(f"/table/{table_id}/schema")
+    if tool_name in ("update_column", "delete_column"):
+        return lambda uri, text: uri.endswith("/schema") and (text is None or str(column_id) in text)
+    return None
+
+
+class ResourceSnapshots:
+    """Resource bodies with their content hashes, and the URIs clients subscribed to"""
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self.entries: Dict[str, Tuple[float, str, str]] = {}  # uri -> (expires, etag, text)
+        self.subscriptions = set()
+        self._lock = threading.Lock()
+
+    def get(self, uri: str) -> Optional[str]:
+        """Snapshot text while it is fresh"""
+        with self._lock:
+            entry = self.entries.get(uri)
+            if entry and entry[0] > time.monotonic():
+                return entry[2]
+            return None
+
+    def put(self, uri: str, text: str) -> bool:
+        """Store a fresh snapshot; True when it differs from the one it replaces"""
+        etag = content_etag(text.encode())
+        with self._lock:
+            previous = self.entries.get(uri)
+            self.entries[uri] = (time.monotonic() + self.ttl, etag, text)
+        return previous is not None and previous[1] != etag
+
+    def invalidate(self, predicate: Callable[[str, Optional[str]], bool]) -> List[str]:
+        """
+        Drop the matching snapshots and return the matching subscribed URIs. The
+        caller reports those as changed, so the next snapshot is a new baseline.
+        """
+        with self._lock:
+            texts = {uri: entry[2] for uri, entry in self.entries.items()}
+            for uri, text in texts.items():
+                if predicate(uri, text):
+                    del self.entries[uri]
+            return sorted(uri for uri in self.subscriptions if predicate(uri, texts.get(uri)))
+
+    def subscribe(self, uri: str):
+        with self._lock:
+            self.subscriptions.add(uri)
+
+    def unsubscribe(self, uri: str):
+        with self._lock:
+            self.subscriptions.discard(uri)
+
+    def is_subscribed(self, uri: str) -> bool:
+        with self._lock:
+            return uri in self.subscriptions
+
+    def subscribed(self) -> List[str]:
+        with self._lock:
+            return sorted(self.subscriptions)
@@ -0,0 +1,221 @@
+"""
+In-memory inverted index backing global_search
+
+Text values of the configured tables are tokenized (lowercased, accents
+removed) into per-term posting lists and ranked with BM25. Each query term also
+matches indexed terms it is a prefix of and, when nothing matches it directly,
+terms within a small edit distance. The index is built page by page and updated
+record by record, so it stays usable while it loads and after every write.
+Methods are thread-safe; the MCP stdio server calls them from worker threads.
+"""
+
+import asyncio
+import logging
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from nocodb_format import is_system_field
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+# Weight of a query term's matches relative to an exact match
+PREFIX_WEIGHT = 0.7
+FUZZY_WEIGHT = 0.5
+MAX_EXPANSIONS = 50
+
+Key = Tuple[str, str]
+
+
+def tokenize(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _WORD.findall(text)
+
+
+def _text_values(record: Dict[str, Any]) -> Iterable[str]:
+    for name, value in record.items():
+        if is_system_field(name) or name == "Id":
+            continue
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, list):
+            yield from (item for item in value if isinstance(item, str))
+
+
+def _within_distance(a: str, b: str, limit: int) -> bool:
+    """Levenshtein distance of a and b is at most `limit`"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ch in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ch != other)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class SearchIndex:
+    def __init__(self, tables: List[str], k1: float = 1.2, b: float = 0.75):
+        self.tables = set(tables)
+        self.k1 = k1
+        self.b = b
+        self.records: Dict[Key, Dict[str, Any]] = {}
+        self.terms: Dict[Key, Counter] = {}
+        self.lengths: Dict[Key, int] = {}
+        self.postings: Dict[str, Dict[Key, int]] = {}
+        self.total_length = 0
+        self.loaded = set()
+        self.searches = 0
+        self._vocabulary: Optional[List[str]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.RLock()
+
+    @property
+    def ready(self) -> bool:
+        """Every configured table has been fully indexed"""
+        return self.loaded >= self.tables
+
+    # Updates
+    def add(self, table_id: str, rows: List[Dict[str, Any]]):
+        """Index (or re-index) complete records"""
+        with self._lock:
+            if table_id not in self.tables:
+                return
+            for row in rows:
+                if row.get("Id") is None:
+                    continue
+                key = (table_id, str(row["Id"]))
+                self._remove(key)
+                terms = Counter(token for text in _text_values(row) for token in tokenize(text))
+                self.records[key] = row
+                self.terms[key] = terms
+                self.lengths[key] = sum(terms.values())
+                self.total_length += self.lengths[key]
+                for term, count in terms.items():
+                    postings = self.postings.get(term)
+                    if postings is None:
+                        postings = self.postings[term] = {}
+                        self._vocabulary = None
+                    postings[key] = count
+
+    def update(self, table_id: str, record_id: Any, changes: Dict[str, Any]):
+        """Apply a partial update to an indexed record"""
+        with self._lock:
+            record = self.records.get((table_id, str(record_id)))
+            if record is not None:
+                self.add(table_id, [{**record, **changes}])
+
+    def remove(self, table_id: str, record_ids: Iterable[Any]):
+        with self._lock:
+            for record_id in record_ids:
+                self._remove((table_id, str(record_id)))
+
+    def drop_table(self, table_id: str):
+        """Forget a table; it is indexed again on the next build"""
+        with self._lock:
+            for key in [key for key in self.records if key[0] == table_id]:
+                self._remove(key)
+            self.loaded.discard(table_id)
+
+    def _remove(self, key: Key):
+        terms = self.terms.pop(key, None)
+        if terms is None:
+            return
+        del self.records[key]
+        self.total_length -= self.lengths.pop(key)
+        for term in terms:
+            postings = self.postings[term]
+            del postings[key]
+            if not postings:
+                del self.postings[term]
+                self._vocabulary = None
+
+    # Build
+    async def build(self, api):
+        for table_id in sorted(self.tables - self.loaded):
+            try:
+                async for rows in api.iter_records(table_id):
+                    self.add(table_id, rows)
+                self.loaded.add(table_id)
+                logger.info(f"Search index built for {table_id}: {len(self.records)} records indexed")
+            except Exception as e:
+                logger.error(f"Search index build of {table_id} failed: {e}")
+
+    def start(self, api):
+        self._task = asyncio.create_task(self.build(api))
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    # Search
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Indexed terms a query token matches, with their weights"""
+        matches = []
+        if token in self.postings:
+            matches.append((token, 1.0))
+        if len(token) >= 2:
+            if self._vocabulary is None:
+                self._vocabulary = sorted(self.postings)
+            start = bisect_left(self._vocabulary, token)
+            for term in self._vocabulary[start:start + MAX_EXPANSIONS + 1]:
+                if not term.startswith(token):
+                    break
+                if term != token:
+                    matches.append((term, PREFIX_WEIGHT))
+        if not matches and len(token) >= 4:
+            limit = 1 if len(token) < 8 else 2
+            matches = [(term, FUZZY_WEIGHT) for term in self.postings
+                       if term[0] == token[0] and _within_distance(token, term, limit)][:MAX_EXPANSIONS]
+        return matches
+
+    def search(self, query: str, limit: int = 25, tables: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """BM25-ranked records matching the query, best first"""
+        with self._lock:
+            self.searches += 1
+            documents = len(self.records)
+            if not documents:
+                return []
+            average_length = self.total_length / documents or 1
+            allowed = set(tables) if tables else None
+
+            scores: Dict[Key, float] = {}
+            for token in dict.fromkeys(tokenize(query)):
+                best: Dict[Key, float] = {}
+                for term, weight in self._expand(token):
+                    postings = self.postings[term]
+                    idf = math.log(1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for key, frequency in postings.items():
+                        if allowed is not None and key[0] not in allowed:
+                            continue
+                        score = weight * idf * frequency * (self.k1 + 1) / (
+                            frequency + self.k1 * (1 - self.b + self.b * self.lengths[key] / average_length))
+                        if score > best.get(key, 0):
+                            best[key] = score
+                for key, score in best.items():
+                    scores[key] = scores.get(key, 0) + score
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            return [
+                {"table_id": key[0], "record_id": key[1], "score": round(score, 4), "record": self.records[key]}
+                for key, score in ranked
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "records": len(self.records),
+            "terms": len(self.postings),
+            "tables": sorted(self.tables),
+            "ready": self.ready,
+            "searches": self.searches
+        }
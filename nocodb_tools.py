@@ -0,0 +1,205 @@
+"""
+Declarative tool registry shared by the MCP stdio server and the HTTP server
+
+A ToolRegistry is built once at startup from tool declarations (name,
+description, inputSchema). It keeps the tools/list payload already serialized
+and compiles every inputSchema into a validator, so a call with missing,
+unknown or mistyped arguments is rejected before any request goes to NocoDB.
+Declarations can also be derived from method signatures (str, int, float, bool,
+List, Dict and Optional annotations).
+"""
+
+import inspect
+import typing
+from typing import Any, Callable, Dict, List, Optional
+
+from nocodb_json import dumpb, fragment
+
+Validator = Callable[[Any, str], Any]
+
+_ANNOTATION_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean", list: "array", dict: "object"}
+
+
+class ToolArgumentError(ValueError):
+    """The arguments of a tool call do not match its inputSchema"""
+
+
+# Validators: each takes (value, path) and returns the value, converting scalars
+# whose conversion is lossless (e.g. a numeric record_id given for a string)
+def _string(value: Any, path: str) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ToolArgumentError(f"{path} must be a string")
+
+
+def _integer(value: Any, path: str) -> int:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise ToolArgumentError(f"{path} must be an integer")
+
+
+def _number(value: Any, path: str) -> Any:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            pass
+    raise ToolArgumentError(f"{path} must be a number")
+
+
+def _boolean(value: Any, path: str) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    raise ToolArgumentError(f"{path} must be a boolean")
+
+
+def _any(value: Any, path: str) -> Any:
+    return value
+
+
+def compile_schema(schema: Dict[str, Any], strict: bool = False) -> Validator:
+    """
+    Compile a JSON Schema (type, properties, required, items, enum) into a
+    validator. With strict, properties that are not declared are rejected; tool
+    arguments are passed to handlers as keyword arguments, so unknown names
+    would otherwise only fail inside the handler.
+    """
+    kind = schema.get("type")
+    if kind == "object":
+        check = _object(schema, strict)
+    elif kind == "array":
+        check = _array(schema)
+    else:
+        check = {"string": _string, "integer": _integer, "number": _number, "boolean": _boolean}.get(kind, _any)
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+        base = check
+
+        def check(value: Any, path: str) -> Any:
+            value = base(value, path)
+            if value not in allowed:
+                raise ToolArgumentError(f"{path} must be one of {', '.join(map(str, allowed))}")
+            return value
+    return check
+
+
+def _array(schema: Dict[str, Any]) -> Validator:
+    item = compile_schema(schema["items"]) if "items" in schema else None
+
+    def check(value: Any, path: str) -> List[Any]:
+        if not isinstance(value, list):
+            raise ToolArgumentError(f"{path} must be an array")
+        if item is None:
+            return value
+        return [item(entry, f"{path}[{index}]") for index, entry in enumerate(value)]
+    return check
+
+
+def _object(schema: Dict[str, Any], strict: bool) -> Validator:
+    properties = {name: compile_schema(prop) for name, prop in schema.get("properties", {}).items()}
+    required = list(schema.get("required", []))
+
+    def check(value: Any, path: str) -> Dict[str, Any]:
+        if not isinstance(value, dict):
+            raise ToolArgumentError(f"{path or 'arguments'} must be an object")
+        missing = [name for name in required if value.get(name) is None]
+        if missing:
+            raise ToolArgumentError(f"missing required argument(s): {', '.join(missing)}")
+        result = {}
+        for name, entry in value.items():
+            prop = properties.get(name)
+            if prop is None:
+                if strict:
+                    raise ToolArgumentError(f"unexpected argument: {name}")
+                result[name] = entry
+            elif entry is None:
+                # Optional arguments may be sent as null; the handler default applies
+                result[name] = None
+            else:
+                result[name] = prop(entry, f"{path}.{name}" if path else name)
+        return result
+    return check
+
+
+def schema_from_annotation(annotation: Any) -> Optional[Dict[str, Any]]:
+    """JSON Schema of a parameter annotation; None for types that cannot come from JSON (callbacks)"""
+    if annotation is inspect.Parameter.empty or annotation is Any:
+        return {}
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Union:
+        options = [arg for arg in args if arg is not type(None)]
+        return schema_from_annotation(options[0]) if len(options) == 1 else {}
+    if origin is not None:
+        if origin not in _ANNOTATION_TYPES:
+            return None
+        schema = {"type": _ANNOTATION_TYPES[origin]}
+        if origin is list and args:
+            items = schema_from_annotation(args[0])
+            if items:
+                schema["items"] = items
+        return schema
+    if annotation in _ANNOTATION_TYPES:
+        return {"type": _ANNOTATION_TYPES[annotation]}
+    return None
+
+
+def schema_from_signature(func: Callable) -> Dict[str, Any]:
+    """inputSchema of a function: parameters without a default are required"""
+    hints = typing.get_type_hints(func)
+    properties = {}
+    required = []
+    for name, param in inspect.signature(func).parameters.items():
+        prop = schema_from_annotation(hints.get(name, param.annotation))
+        if prop is None:
+            continue
+        if param.default is inspect.Parameter.empty:
+            required.append(name)
+        elif param.default is not None:
+            prop = {**prop, "default": param.default}
+        properties[name] = prop
+    schema = {"type": "object", "properties": properties}
+    if required:
+        schema["required"] = required
+    return schema
+
+
+class ToolRegistry:
+    def __init__(self, tools: List[Dict[str, Any]]):
+        self.tools = {tool["name"]: tool for tool in tools}
+        self.validators = {tool["name"]: compile_schema(tool["inputSchema"], strict=True) for tool in tools}
+        self.listing = {"tools": list(tools)}
+        self.listing_json = dumpb(self.listing)
+
+    @classmethod
+    def from_methods(cls, target: Any, descriptions: Dict[str, str]) -> "ToolRegistry":
+        """Registry of target's methods named in descriptions, schemas taken from their signatures"""
+        return cls([
+            {"name": name, "description": description, "inputSchema": schema_from_signature(getattr(target, name))}
+            for name, description in descriptions.items()
+        ])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.tools
+
+    def payload(self) -> Any:
+        """The tools/list result, embedded in responses without serializing it again"""
+        return fragment(self.listing_json, self.listing)
+
+    def validate(self, name: str, arguments: Any) -> Dict[str, Any]:
+        """Checked (and losslessly converted) arguments; raises ToolArgumentError"""
+        return self.validators[name](arguments, "")
@@ -0,0 +1,340 @@
+"""
+Parser and local evaluator for the NocoDB `where` filter syntax
+
+    (Status,eq,Open)~and((Amount,gt,100)~or~not(Tags,anyof,vip,promo))
+
+is parsed into a small immutable AST made of tuples:
+
+    ("cond", field, op, value)      value is the raw text after the op, or None
+    ("and", (node, ...))
+    ("or", (node, ...))
+    ("not", node)
+
+`~and` binds tighter than `~or`. The AST gives a canonical text form (operator
+aliases resolved, nested groups flattened, and/or operands sorted) for cache
+keys, lets malformed filters be rejected before any request is sent, and can be
+compiled into a predicate over in-memory rows.
+"""
+
+import datetime
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Node = Tuple
+
+# Comparison operators NocoDB accepts, with their aliases
+OPERATORS = {
+    "eq", "neq", "not", "gt", "lt", "gte", "lte", "like", "nlike", "in", "is", "isnot",
+    "btw", "nbtw", "allof", "anyof", "nallof", "nanyof", "blank", "notblank",
+    "null", "notnull", "empty", "notempty", "checked", "notchecked", "iswithin"
+}
+ALIASES = {"ge": "gte", "le": "lte"}
+# Operators that take no value
+UNARY_OPERATORS = {"blank", "notblank", "null", "notnull", "empty", "notempty", "checked", "notchecked"}
+# Operators whose value is a comma-separated list
+LIST_OPERATORS = {"in", "btw", "nbtw", "allof", "anyof", "nallof", "nanyof"}
+
+# Date comparison sub-operators ("(CreatedAt,gt,exactDate,2024-01-31)"); only the
+# first group can be evaluated locally
+DATE_SUBOPS = {"exactDate", "today", "tomorrow", "yesterday"}
+RELATIVE_DATE_SUBOPS = {
+    "oneWeekAgo", "oneWeekFromNow", "oneMonthAgo", "oneMonthFromNow", "daysAgo", "daysFromNow",
+    "pastWeek", "pastMonth", "pastYear", "nextWeek", "nextMonth", "nextYear",
+    "pastNumberOfDays", "nextNumberOfDays"
+}
+
+
+class WhereSyntaxError(ValueError):
+    """The filter is malformed; raised before anything is sent to NocoDB"""
+
+
+class UnsupportedFilterError(ValueError):
+    """The filter is valid but cannot be evaluated locally (e.g. relative date ranges)"""
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def error(self, message: str) -> WhereSyntaxError:
+        return WhereSyntaxError(f"Invalid where at position {self.pos}: {message} in {self.text!r}")
+
+    def skip_spaces(self):
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+
+    def keyword(self, word: str) -> bool:
+        self.skip_spaces()
+        if self.text.startswith(word, self.pos):
+            self.pos += len(word)
+            return True
+        return False
+
+    def parse(self) -> Node:
+        node = self.parse_or()
+        self.skip_spaces()
+        if self.pos != len(self.text):
+            raise self.error("unexpected text")
+        return node
+
+    def parse_or(self) -> Node:
+        nodes = [self.parse_and()]
+        while self.keyword("~or"):
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", tuple(nodes))
+
+    def parse_and(self) -> Node:
+        nodes = [self.parse_unary()]
+        while self.keyword("~and"):
+            nodes.append(self.parse_unary())
+        return nodes[0] if len(nodes) == 1 else ("and", tuple(nodes))
+
+    def parse_unary(self) -> Node:
+        if self.keyword("~not"):
+            return ("not", self.parse_unary())
+        self.skip_spaces()
+        if not self.text.startswith("(", self.pos):
+            raise self.error("expected '('")
+        self.pos += 1
+        self.skip_spaces()
+        if self.text.startswith(("(", "~"), self.pos):
+            node = self.parse_or()
+            if not self.keyword(")"):
+                raise self.error("expected ')'")
+            return node
+        return self.parse_condition()
+
+    def parse_condition(self) -> Node:
+        # The value runs to the first ')' that closes the condition, so it may contain commas
+        start = self.pos
+        end = start
+        while True:
+            end = self.text.find(")", end)
+            if end == -1:
+                raise self.error("unterminated condition")
+            following = self.text[end + 1:].lstrip()
+            if not following or following.startswith((")", "~")):
+                break
+            if following.startswith("("):
+                raise self.error("conditions must be joined with ~and, ~or or ~not")
+            end += 1
+        body = self.text[start:end]
+        self.pos = end + 1
+
+        parts = body.split(",", 2)
+        if len(parts) < 2:
+            raise self.error(f"condition ({body}) needs a field and an operator")
+        field, op = parts[0].strip(), parts[1].strip()
+        value = parts[2] if len(parts) == 3 else None
+        if not field:
+            raise self.error(f"condition ({body}) has no field")
+        op = ALIASES.get(op.lower(), op.lower())
+        if op not in OPERATORS:
+            raise self.error(f"unknown operator {parts[1].strip()!r}")
+        if op not in UNARY_OPERATORS and op not in ("is", "isnot") and value is None:
+            raise self.error(f"operator {op} needs a value")
+        if op in ("btw", "nbtw") and (value is None or len(value.split(",")) != 2):
+            raise self.error(f"operator {op} needs two comma-separated values")
+        return ("cond", field, op, value)
+
+
+@lru_cache(maxsize=1024)
+def parse_where(where: Optional[str]) -> Optional[Node]:
+    """Parse a where string into an AST; None or "" gives None. Raises WhereSyntaxError."""
+    if where is None or not where.strip():
+        return None
+    return _Parser(where).parse()
+
+
+def _flatten(node: Node) -> Node:
+    kind = node[0]
+    if kind == "not":
+        return ("not", _flatten(node[1]))
+    if kind in ("and", "or"):
+        children = []
+        for child in node[1]:
+            child = _flatten(child)
+            children.extend(child[1] if child[0] == kind else [child])
+        return (kind, tuple(children))
+    return node
+
+
+def to_text(node: Optional[Node]) -> str:
+    """Render an AST back to where syntax"""
+    if node is None:
+        return ""
+    kind = node[0]
+    if kind == "cond":
+        _, field, op, value = node
+        return f"({field},{op})" if value is None else f"({field},{op},{value})"
+    if kind == "not":
+        return f"~not{to_text(node[1])}"
+    return "(" + f"~{kind}".join(to_text(child) for child in node[1]) + ")"
+
+
+def canonical_where(where: Optional[str]) -> str:
+    """Canonical text of a filter; equivalent spellings give the same string"""
+    def canonical(node: Node) -> Node:
+        kind = node[0]
+        if kind == "not":
+            return ("not", canonical(node[1]))
+        if kind in ("and", "or"):
+            children = {to_text(child): child for child in (canonical(child) for child in node[1])}
+            return (kind, tuple(children[text] for text in sorted(children)))
+        return node
+
+    node = parse_where(where)
+    return to_text(canonical(_flatten(node))) if node is not None else ""
+
+
+# Local evaluation
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _date_target(value: str) -> Tuple[Optional[str], str]:
+    """Split a date comparison value ("exactDate,2024-01-31", "today") into (date, raw)"""
+    head, _, rest = value.partition(",")
+    if head in RELATIVE_DATE_SUBOPS:
+        raise UnsupportedFilterError(f"Relative date filter {head} cannot be evaluated locally")
+    if head not in DATE_SUBOPS:
+        return None, value
+    today = datetime.date.today()
+    if head == "exactDate":
+        return rest.strip(), value
+    if head == "today":
+        return today.isoformat(), value
+    if head == "tomorrow":
+        return (today + datetime.timedelta(days=1)).isoformat(), value
+    return (today - datetime.timedelta(days=1)).isoformat(), value
+
+
+def _compare(actual: Any, expected: str, date: Optional[str]) -> Optional[int]:
+    """-1/0/1 comparing a row value with a filter value, None when they are not comparable"""
+    if actual is None:
+        return None
+    if date is not None:
+        left, right = str(actual)[:len(date)], date
+    elif isinstance(actual, bool):
+        left, right = actual, expected.strip().lower() in ("true", "1")
+    elif _number(actual) is not None and _number(expected) is not None:
+        left, right = _number(actual), _number(expected)
+    else:
+        left, right = str(actual), expected
+    return (left > right) - (left < right)
+
+
+def _items(value: Any) -> List[str]:
+    """Multi-select cells come back as "a,b" strings or lists"""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    return [item.strip() for item in str(value).split(",") if item.strip()]
+
+
+def _is_blank(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _like(pattern: str) -> Callable[[Any], bool]:
+    if "%" in pattern or "_" in pattern:
+        regex = re.compile(
+            "^" + "".join(".*" if ch == "%" else "." if ch == "_" else re.escape(ch) for ch in pattern) + "$",
+            re.IGNORECASE | re.DOTALL
+        )
+        return lambda value: value is not None and bool(regex.match(str(value)))
+    needle = pattern.lower()
+    return lambda value: value is not None and needle in str(value).lower()
+
+
+def _compile_condition(field: str, op: str, value: Optional[str]) -> Callable[[Dict[str, Any]], bool]:
+    if op in ("blank", "null", "empty"):
+        return lambda row: _is_blank(row.get(field))
+    if op in ("notblank", "notnull", "notempty"):
+        return lambda row: not _is_blank(row.get(field))
+    if op == "checked":
+        return lambda row: bool(row.get(field))
+    if op == "notchecked":
+        return lambda row: not row.get(field)
+    if op in ("is", "isnot"):
+        state = (value or "").strip().lower()
+        checks = {
+            "null": lambda v: v is None, "notnull": lambda v: v is not None,
+            "blank": _is_blank, "notblank": lambda v: not _is_blank(v),
+            "empty": lambda v: v == "", "notempty": lambda v: v != "",
+            "true": lambda v: v is True, "false": lambda v: v is False or v is None
+        }
+        if state not in checks:
+            raise UnsupportedFilterError(f"({field},{op},{value}) cannot be evaluated locally")
+        check = checks[state]
+        if op == "isnot":
+            return lambda row: not check(row.get(field))
+        return lambda row: check(row.get(field))
+    if op in ("like", "nlike"):
+        match = _like(value)
+        if op == "nlike":
+            return lambda row: not match(row.get(field))
+        return lambda row: match(row.get(field))
+    if op in LIST_OPERATORS:
+        expected = [item.strip() for item in value.split(",")]
+        if op in ("btw", "nbtw"):
+            low, high = expected
+            inside = lambda v: _compare(v, low, None) in (0, 1) and _compare(v, high, None) in (-1, 0)
+            if op == "nbtw":
+                return lambda row: row.get(field) is not None and not inside(row.get(field))
+            return lambda row: inside(row.get(field))
+        if op == "in":
+            return lambda row: any(_compare(row.get(field), item, None) == 0 for item in expected)
+        wanted = set(expected)
+        tests = {
+            "anyof": lambda items: bool(wanted & items),
+            "allof": lambda items: wanted <= items,
+            "nanyof": lambda items: not wanted & items,
+            "nallof": lambda items: not wanted <= items
+        }
+        test = tests[op]
+        return lambda row: test(set(_items(row.get(field))))
+    if op == "iswithin":
+        raise UnsupportedFilterError(f"({field},{op},{value}) cannot be evaluated locally")
+
+    date, expected = _date_target(value)
+    results = {
+        "eq": (0,), "gt": (1,), "lt": (-1,), "gte": (0, 1), "lte": (-1, 0)
+    }
+    if op in ("neq", "not"):
+        return lambda row: _compare(row.get(field), expected, date) != 0
+    accepted = results[op]
+    return lambda row: _compare(row.get(field), expected, date) in accepted
+
+
+def compile_where(where: Optional[str]) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Predicate over a record dict. Raises WhereSyntaxError for malformed filters and
+    UnsupportedFilterError for filters that only NocoDB can evaluate.
+    """
+    def build(node: Node) -> Callable[[Dict[str, Any]], bool]:
+        kind = node[0]
+        if kind == "cond":
+            return _compile_condition(*node[1:])
+        if kind == "not":
+            inner = build(node[1])
+            return lambda row: not inner(row)
+        children = [build(child) for child in node[1]]
+        if kind == "and":
+            return lambda row: all(child(row) for child in children)
+        return lambda row: any(child(row) for child in children)
+
+    node = parse_where(where)
+    if node is None:
+        return lambda row: True
+    return build(node)
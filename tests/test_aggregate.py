@@ -0,0 +1,32 @@
+import pytest
+
+from nocodb_aggregate import Aggregator, parse_aggregate
+
+
+def test_parse_aggregate():
+    assert parse_aggregate("sum(Amount)") == ("sum", "Amount")
+    assert parse_aggregate(" COUNT( * ) ") == ("count", None)
+    for expression in ("median(Amount)", "sum(*)", "Amount"):
+        with pytest.raises(ValueError):
+            parse_aggregate(expression)
+
+
+def test_group_by_across_pages():
+    aggregator = Aggregator(["Region"], ["count(*)", "sum(Amount)", "avg(Amount)", "min(Amount)", "max(Amount)"])
+    aggregator.add([{"Region": "N", "Amount": 10}, {"Region": "S", "Amount": "5"}])
+    aggregator.add([{"Region": "N", "Amount": 30}, {"Region": "N", "Amount": None}])
+    result = aggregator.result()
+    assert result["rows_scanned"] == 4
+    by_region = {row["Region"]: row for row in result["list"]}
+    assert by_region["N"] == {"Region": "N", "count(*)": 3, "sum(Amount)": 40, "avg(Amount)": 20.0,
+                              "min(Amount)": 10, "max(Amount)": 30}
+    assert by_region["S"]["sum(Amount)"] == 5
+
+
+def test_empty_table_has_one_global_row():
+    aggregator = Aggregator([], ["count(*)", "sum(Amount)", "avg(Amount)"])
+    assert aggregator.result()["list"] == [{"count(*)": 0, "sum(Amount)": 0, "avg(Amount)": None}]
+
+
+def test_fields_to_fetch():
+    assert Aggregator(["Region"], ["count(*)", "sum(Amount)"]).fields() == ["Region", "Amount"]
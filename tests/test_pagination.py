@@ -0,0 +1,51 @@
+import pytest
+
+from nocodb_pagination import cursor_fields, decode_cursor, encode_cursor, keyset_query, next_cursor
+
+
+def test_first_page_defaults_to_id():
+    assert keyset_query() == (None, ["Id"], {"field": "Id", "desc": False})
+
+
+def test_next_page_predicate():
+    _, _, state = keyset_query("(Status,eq,Open)")
+    cursor = next_cursor([{"Id": 7}, {"Id": 9}], state, {"isLastPage": False})
+    where, sort, _ = keyset_query("(Status,eq,Open)", None, cursor)
+    assert where == "((Status,eq,Open))~and(Id,gt,9)"
+    assert sort == ["Id"]
+
+
+def test_descending_key_uses_id_tie_breaker():
+    _, sort, state = keyset_query(None, "-Amount")
+    assert sort == ["-Amount", "-Id"]
+    cursor = next_cursor([{"Id": 4, "Amount": 12.5}], state, {})
+    where, _, _ = keyset_query(None, None, cursor)
+    assert where == "((Amount,lt,12.5)~or((Amount,eq,12.5)~and(Id,lt,4)))"
+
+
+def test_end_comes_from_page_info():
+    _, _, state = keyset_query()
+    # A page shorter than requested is not the last one: NocoDB caps `limit`
+    assert next_cursor([{"Id": 1}], state, {"isLastPage": False}) is not None
+    assert next_cursor([{"Id": 1}], state, {"isLastPage": True}) is None
+    assert next_cursor([], state, {"isLastPage": False}) is None
+
+
+@pytest.mark.parametrize("value", ["a,b)", "2024-01-31", None, True])
+def test_non_numeric_keys_are_rejected(value):
+    _, _, state = keyset_query(None, "Title")
+    with pytest.raises(ValueError):
+        next_cursor([{"Id": 1, "Title": value}], state, {})
+
+
+def test_tampered_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor({"field": "Id", "value": "1)~or(Id,gt,0"}))
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_cursor_fields_keep_keys():
+    _, _, state = keyset_query(None, "Amount")
+    assert cursor_fields(["Title"], state) == ["Title", "Amount", "Id"]
+    assert cursor_fields(None, state) is None
@@ -0,0 +1,60 @@
+import pytest
+
+from nocodb_where import WhereSyntaxError, UnsupportedFilterError, canonical_where, compile_where, parse_where
+
+
+def test_parse_condition_and_groups():
+    assert parse_where("(Status,eq,Open)") == ("cond", "Status", "eq", "Open")
+    assert parse_where("(A,eq,1)~and(B,gt,2)~or~not(C,blank)") == (
+        "or", (("and", (("cond", "A", "eq", "1"), ("cond", "B", "gt", "2"))), ("not", ("cond", "C", "blank", None))))
+    assert parse_where("") is None
+
+
+def test_value_may_contain_commas_and_parentheses():
+    assert parse_where("(Title,eq,a, b (c) d)") == ("cond", "Title", "eq", "a, b (c) d")
+    assert parse_where("(Tags,anyof,vip,promo)") == ("cond", "Tags", "anyof", "vip,promo")
+
+
+@pytest.mark.parametrize("where", [
+    "(A,eq,1)(B,eq,2)",
+    "(A,eq,1",
+    "(A)",
+    "(A,unknown,1)",
+    "(A,eq)",
+    "(A,btw,1)",
+    "(A,eq,1)~and",
+    "(A,eq,1) trailing",
+])
+def test_rejects_malformed(where):
+    with pytest.raises(WhereSyntaxError):
+        parse_where(where)
+
+
+def test_canonical_form():
+    assert canonical_where("(B,ge,2)~and(A,eq,1)") == canonical_where("((A,eq,1)~and(B,gte,2))")
+    assert canonical_where("(A,eq,1)~or(B,eq,2)") != canonical_where("(A,eq,1)~and(B,eq,2)")
+
+
+def test_local_evaluation():
+    rows = [
+        {"Id": 1, "Status": "Open", "Amount": 150, "Tags": ["vip"]},
+        {"Id": 2, "Status": "Closed", "Amount": 50, "Tags": []},
+        {"Id": 3, "Status": "Open", "Amount": 20, "Tags": None},
+    ]
+
+    def ids(where):
+        predicate = compile_where(where)
+        return [row["Id"] for row in rows if predicate(row)]
+
+    assert ids("(Status,eq,Open)") == [1, 3]
+    assert ids("(Status,eq,Open)~and(Amount,gt,100)") == [1]
+    assert ids("(Amount,btw,40,200)") == [1, 2]
+    assert ids("~not(Status,eq,Open)") == [2]
+    assert ids("(Tags,anyof,vip,promo)") == [1]
+    assert ids("(Status,like,%pe%)") == [1, 3]
+    assert ids("") == [1, 2, 3]
+
+
+def test_relative_dates_are_not_evaluated_locally():
+    with pytest.raises(UnsupportedFilterError):
+        compile_where("(CreatedAt,gt,pastWeek)")